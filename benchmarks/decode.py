@@ -0,0 +1,174 @@
+"""
+microbenchmarks of decoding, without network
+
+measures objects per second and bytes allocated per object for the decoding entry points,
+on synthetic payloads from payloads.Dataset. the results can be stored as JSON and compared
+with a baseline, the script exits with 1 if a throughput dropped more than the threshold.
+
+usage:
+    python benchmarks/decode.py --output decode.json
+    python benchmarks/decode.py --compare decode.json --threshold 0.15
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import openproject_api_client as opc
+import openproject_api_client.resources as res
+
+import results
+from payloads import Dataset, collection
+
+PAGE_SIZE = 100
+
+
+def _work_package_pages(dataset: Dataset):
+    wps = dataset.work_packages
+    return [collection(wps[i:i + PAGE_SIZE], '/api/v3/work_packages', 'WorkPackageCollection', total=len(wps),
+                       page_size=PAGE_SIZE, offset=i // PAGE_SIZE + 1)
+            for i in range(0, len(wps), PAGE_SIZE)]
+
+
+def _decode_elements(page: dict):
+    return list(opc.ApiClient.decode(page))
+
+
+def benchmarks(dataset: Dataset) -> dict:
+    """
+    name -> (inputs, function decoding one input, objects per input)
+    """
+    pages = _work_package_pages(dataset)
+    bodies = [json.dumps(page).encode() for page in pages]
+    return {
+        'ApiClient.decode[WorkPackage]': (dataset.work_packages, opc.ApiClient.decode, 1),
+        'ApiClient.decode[Project]': (dataset.projects, opc.ApiClient.decode, 1),
+        'ApiClient.decode[Relation]': (dataset.relations, opc.ApiClient.decode, 1),
+        'ApiClient.decode[User]': (dataset.users, opc.ApiClient.decode, 1),
+        'ApiClient.decode[Version]': (dataset.versions, opc.ApiClient.decode, 1),
+        'GenericType.__init__': (dataset.work_packages, res.GenericType, 1),
+        'WorkPackage.__init__': (dataset.work_packages, res.WorkPackage, 1),
+        'WorkPackage.__init__[embedded]': (
+            [dataset.embedded_work_package(wp) for wp in dataset.work_packages], res.WorkPackage, 1),
+        'Collection.__init__': (pages, res.WorkPackageCollection, 1),
+        'Collection.elements': (pages, _decode_elements, PAGE_SIZE),
+        'Grid.__init__[widgets]': (dataset.grids, res.Grid, 1),
+        'decode_content[WorkPackageCollection]': (
+            bodies, lambda body: list(opc.ApiClient.decode_content(body)), PAGE_SIZE),
+    }
+
+
+def _clear_caches():
+    # every round starts with cold timestamp caches, the synthetic timestamps are nearly unique
+    # like in a real instance
+    for fn in (res._parse_datetime_str, res._parse_date_str):
+        fn.cache_clear()
+
+
+def measure_time(inputs, fn, per_input: int, repeat: int, min_time: float) -> dict:
+    """
+    decodes all inputs in every round, repeated until `repeat` rounds and `min_time` seconds.
+    the garbage collector is disabled during a round.
+    """
+    rounds = []
+    gc_enabled = gc.isenabled()
+    while len(rounds) < repeat or sum(rounds) < min_time:
+        _clear_caches()
+        # like timeit, collections triggered by the payloads held in memory would dominate the noise
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for value in inputs:
+                fn(value)
+            rounds.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    objects = len(inputs) * per_input
+    best = min(rounds)
+    return {
+        'rounds': len(rounds),
+        'objects': objects,
+        'best_seconds': best,
+        'mean_seconds': sum(rounds) / len(rounds),
+        'objects_per_second': objects / best,
+        'us_per_object': best / objects * 1e6,
+    }
+
+
+def measure_memory(inputs, fn, per_input: int) -> dict:
+    """
+    bytes allocated while decoding (peak) and kept by the decoded objects, per object
+    """
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        decoded = [fn(value) for value in inputs]
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    objects = len(inputs) * per_input
+    del decoded
+    return {
+        'retained_bytes_per_object': (current - base) / objects,
+        'peak_bytes_per_object': (peak - base) / objects,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='microbenchmarks of decoding')
+    parser.add_argument('--work-packages', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5, help='min. rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=1.0, help='min. seconds per benchmark')
+    parser.add_argument('--lazy-dates', action='store_true', help='decode like ApiClient(lazy_dates=True)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--benchmark', action='append', help='run only benchmarks starting with this, can be repeated')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='drop of objects per second counted as regression, default 0.1 = 10%%')
+    args = parser.parse_args()
+
+    dataset = Dataset(work_packages=args.work_packages, relations=args.work_packages, users=1000,
+                      versions=200, grids=200, seed=args.seed)
+    config = {'work_packages': args.work_packages, 'seed': args.seed, 'lazy_dates': args.lazy_dates}
+    current = results.new_results('decode', config)
+
+    for name, (inputs, fn, per_input) in benchmarks(dataset).items():
+        if args.benchmark and not any(name.startswith(prefix) for prefix in args.benchmark):
+            continue
+
+        with res.lazy_dates(args.lazy_dates):
+            bench = current['benchmarks'][name] = measure_time(inputs, fn, per_input, args.repeat, args.min_time)
+            if not args.no_memory:
+                bench.update(measure_memory(inputs, fn, per_input))
+
+        memory = ''
+        if 'retained_bytes_per_object' in bench:
+            memory = (f"  {bench['retained_bytes_per_object']:>8.0f} B kept"
+                      f"  {bench['peak_bytes_per_object']:>8.0f} B peak")
+        print(f"{name:<40} {bench['objects_per_second']:>11,.0f} obj/s  {bench['us_per_object']:>8.2f} us{memory}")
+
+    if args.output:
+        results.save(current, args.output)
+
+    if args.compare:
+        baseline = results.load(args.compare)
+        if baseline.get('config') != config:
+            print('*warn* baseline was recorded with a different configuration', file=sys.stderr)
+
+        rows = results.compare(current, baseline, 'objects_per_second', args.threshold, higher_is_better=True)
+        results.print_comparison(rows, 'objects per second', baseline)
+        if any(row['regressed'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
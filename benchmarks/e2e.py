@@ -0,0 +1,114 @@
+"""
+end to end benchmarks of the client against the local stub server
+
+times the public methods over HTTP including paging and decoding, stores the results as
+JSON and optionally compares them with the results of an earlier run.
+
+usage:
+    python benchmarks/e2e.py --output e2e.json
+    python benchmarks/e2e.py --latency 20 --workers 4 --compare e2e.json
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import openproject_api_client as opc
+
+import results
+from stubserver import StubServer, add_dataset_arguments, dataset_options
+
+# name -> function(client, args) returning the fetched objects
+BENCHMARKS = {
+    'get_paged_collection': lambda client, args: client.get_paged_collection(
+        'work_packages', page_size=args.page_size),
+    'get_projects_dict': lambda client, args: client.get_projects_dict(),
+    'get_workpackages_by_query_id': lambda client, args: client.get_workpackages_by_query_id(
+        1, page_size=args.page_size),
+    'get_relations': lambda client, args: client.get_relations(),
+}
+
+
+def run_benchmark(url: str, fn, args) -> dict:
+    """
+    runs one benchmark repeatedly with a fresh client each time, so connections are set up
+    in every run like in a script using the client once
+    """
+    runs = []
+    objects = requests = response_bytes = 0
+    for i in range(args.warmup + args.repeat):
+        metrics = opc.ClientMetrics()
+        with opc.ApiClient(url, 'benchmark', workers=args.workers, metrics=metrics) as client:
+            start = time.perf_counter()
+            fetched = fn(client, args)
+            seconds = time.perf_counter() - start
+
+        if i < args.warmup:
+            continue
+
+        runs.append(seconds)
+        objects = len(fetched) if fetched is not None else 0
+        endpoints = metrics.snapshot()['endpoints'].values()
+        requests = sum(e['requests'] for e in endpoints)
+        response_bytes = sum(e['bytes'] for e in endpoints)
+
+    return {
+        'runs': runs,
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'mean': statistics.mean(runs),
+        'stdev': statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        'objects': objects,
+        'requests': requests,
+        'bytes': response_bytes,
+        'objects_per_second': objects / statistics.median(runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='end to end benchmarks against a local stub server')
+    add_dataset_arguments(parser)
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of every response in ms')
+    parser.add_argument('--max-page-size', type=int, default=1000, help='page size cap of the server')
+    parser.add_argument('--page-size', type=int, default=1000, help='page size requested by the client')
+    parser.add_argument('--workers', type=int, default=1, help='pages fetched concurrently')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--benchmark', action='append', choices=sorted(BENCHMARKS),
+                        help='run only this benchmark, can be repeated')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown of the fastest run counted as regression, default 0.1 = 10%%')
+    args = parser.parse_args()
+
+    config = dict(dataset_options(args), latency=args.latency, max_page_size=args.max_page_size,
+                  page_size=args.page_size, workers=args.workers, repeat=args.repeat, warmup=args.warmup)
+    current = results.new_results('e2e', config)
+
+    names = args.benchmark or list(BENCHMARKS)
+    with StubServer(dataset_options(args), args.max_page_size, args.latency / 1000) as server:
+        for name in names:
+            bench = current['benchmarks'][name] = run_benchmark(server.url, BENCHMARKS[name], args)
+            print(f"{name:<32} median {bench['median'] * 1000:9.1f} ms  min {bench['min'] * 1000:9.1f} ms  "
+                  f"{bench['objects']:>7} objects  {bench['requests']:>4} requests  {bench['bytes'] / 1e6:7.1f} MB")
+
+    if args.output:
+        results.save(current, args.output)
+
+    if args.compare:
+        baseline = results.load(args.compare)
+        ignored = ('repeat', 'warmup')
+        if {k: v for k, v in baseline.get('config', {}).items() if k not in ignored} != \
+                {k: v for k, v in config.items() if k not in ignored}:
+            print('*warn* baseline was recorded with a different configuration', file=sys.stderr)
+
+        # the fastest run is the least disturbed by other load on the machine
+        rows = results.compare(current, baseline, 'min', args.threshold)
+        results.print_comparison(rows, 'min seconds', baseline)
+        if any(row['regressed'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+synthetic HAL payloads shaped like the responses of an OpenProject instance (API v3)
+
+the generated data is deterministic for a given seed, so benchmark runs are comparable.
+"""
+import datetime
+import random
+from typing import Dict, List, Optional
+
+API = '/api/v3'
+
+RELATION_TYPES = (('precedes', 'follows'), ('blocks', 'blocked'), ('relates', 'relates'),
+                  ('duplicates', 'duplicated'), ('includes', 'partof'))
+PRIORITIES = ('Low', 'Normal', 'High', 'Immediate')
+
+
+def _link(kind: Optional[str], id_: Optional[int], title: str = None) -> dict:
+    if id_ is None:
+        return {'href': None}
+
+    link = {'href': f'{API}/{kind}/{id_}'}
+    if title is not None:
+        link['title'] = title
+    return link
+
+
+def _timestamp(rng: random.Random, start: datetime.datetime, days: int) -> str:
+    value = start + datetime.timedelta(seconds=rng.randrange(days * 86400))
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def collection(elements: List[dict], href: str, type_: str = 'Collection', total: int = None,
+               page_size: int = None, offset: int = None) -> dict:
+    """
+    HAL collection of the given elements, with paging info if page_size is given
+    """
+    body = {
+        '_type': type_,
+        'total': len(elements) if total is None else total,
+        'count': len(elements),
+        '_embedded': {'elements': elements},
+        '_links': {'self': {'href': href}},
+    }
+    if page_size is not None:
+        body['pageSize'] = page_size
+        body['offset'] = offset
+    return body
+
+
+class Dataset(object):
+    """
+    projects with a deep hierarchy, work packages, relations, users, statuses, versions,
+    types, queries and grids of one synthetic instance
+    """
+
+    def __init__(self, work_packages: int = 20000, projects: int = 200, depth: int = 6,
+                 relations: int = None, users: int = 300, statuses: int = 12, versions: int = 40,
+                 types: int = 8, queries: int = 5, grids: int = 20, seed: int = 1):
+        """
+        :param work_packages: number of work packages
+        :param projects: number of projects
+        :param depth: max. depth of the project hierarchy (1 = all projects on top level)
+        :param relations: number of relations, defaults to half the number of work packages
+        :param seed: seed of the random generator
+        """
+        self.seed = seed
+        self._by_id = {}
+        rng = random.Random(seed)
+        start = datetime.datetime(2019, 1, 1)
+
+        self.statuses = [self.status(i) for i in range(1, statuses + 1)]
+        self.types = [self.type(i) for i in range(1, types + 1)]
+        self.users = [self.user(rng, i, start) for i in range(1, users + 1)]
+        self.projects = self._projects(rng, projects, depth, start)
+        self.versions = [self.version(rng, i, self.projects[i % len(self.projects)]['id'], start)
+                         for i in range(1, versions + 1)]
+        self.work_packages = self._work_packages(rng, work_packages, start)
+        if relations is None:
+            relations = work_packages // 2
+        self.relations = [self.relation(rng, i, work_packages) for i in range(1, relations + 1)] if work_packages > 1 else []
+        self.queries = [self.query(i) for i in range(1, queries + 1)]
+        self.grids = [self.grid(rng, i, start) for i in range(1, grids + 1)]
+
+    def by_id(self, kind: str) -> Dict[int, dict]:
+        index = self._by_id.get(kind)
+        if index is None:
+            index = self._by_id[kind] = {e['id']: e for e in getattr(self, kind)}
+        return index
+
+    def _projects(self, rng: random.Random, count: int, depth: int, start) -> List[dict]:
+        projects = []
+        levels = {}
+        for i in range(1, count + 1):
+            # mostly children of recent projects, limited to depth levels
+            candidates = [p['id'] for p in projects[-50:] if levels[p['id']] < depth - 1]
+            parent = rng.choice(candidates) if candidates and rng.random() < 0.85 else None
+            levels[i] = levels[parent] + 1 if parent else 0
+            projects.append(self.project(rng, i, parent, start))
+
+        return projects
+
+    @staticmethod
+    def status(i: int) -> dict:
+        return {
+            '_type': 'Status', 'id': i, 'name': f'Status {i}', 'isClosed': i % 4 == 0,
+            'color': '#1A67A3', 'isDefault': i == 1, 'isReadonly': False, 'defaultDoneRatio': None,
+            'position': i,
+            '_links': {'self': _link('statuses', i, f'Status {i}')},
+        }
+
+    @staticmethod
+    def type(i: int) -> dict:
+        return {
+            '_type': 'Type', 'id': i, 'name': f'Type {i}', 'color': '#35C53F', 'position': i,
+            'isDefault': i == 1, 'isMilestone': i == 2,
+            'createdAt': '2019-01-01T00:00:00Z', 'updatedAt': '2019-01-01T00:00:00Z',
+            '_links': {'self': _link('types', i, f'Type {i}')},
+        }
+
+    @staticmethod
+    def user(rng: random.Random, i: int, start) -> dict:
+        return {
+            '_type': 'User', 'id': i, 'name': f'User {i}', 'login': f'user{i}',
+            'firstName': 'User', 'lastName': str(i), 'email': f'user{i}@example.com',
+            'admin': i == 1, 'avatar': '', 'status': 'active', 'language': 'en',
+            'identityUrl': None,
+            'createdAt': _timestamp(rng, start, 30), 'updatedAt': _timestamp(rng, start, 700),
+            '_links': {
+                'self': _link('users', i, f'User {i}'),
+                'memberships': {'href': f'{API}/memberships?filters=[{{"principal":{{"operator":"=","values":["{i}"]}}}}]'},
+                'showUser': {'href': f'/users/{i}', 'type': 'text/html'},
+                'lock': {'href': f'{API}/users/{i}/lock', 'method': 'post'},
+            },
+        }
+
+    @staticmethod
+    def project(rng: random.Random, i: int, parent: Optional[int], start) -> dict:
+        return {
+            '_type': 'Project', 'id': i, 'identifier': f'project-{i}', 'name': f'Project {i}',
+            'active': True, 'public': i % 3 == 0,
+            'description': {'format': 'markdown', 'raw': f'Project {i}', 'html': f'<p>Project {i}</p>'},
+            'createdAt': _timestamp(rng, start, 30), 'updatedAt': _timestamp(rng, start, 700),
+            'statusExplanation': {'format': 'markdown', 'raw': '', 'html': ''},
+            '_links': {
+                'self': _link('projects', i, f'Project {i}'),
+                'parent': _link('projects', parent, f'Project {parent}'),
+                'categories': {'href': f'{API}/projects/{i}/categories'},
+                'types': {'href': f'{API}/projects/{i}/types'},
+                'versions': {'href': f'{API}/projects/{i}/versions'},
+                'memberships': {'href': f'{API}/memberships?filters=[{{"project":{{"operator":"=","values":["{i}"]}}}}]'},
+                'workPackages': {'href': f'{API}/projects/{i}/work_packages'},
+                'status': {'href': None},
+            },
+        }
+
+    @staticmethod
+    def version(rng: random.Random, i: int, project_id: int, start) -> dict:
+        return {
+            '_type': 'Version', 'id': i, 'name': f'Version {i}', 'status': 'open', 'sharing': 'none',
+            'description': {'format': 'plain', 'raw': '', 'html': ''},
+            'startDate': (start + datetime.timedelta(days=30 * i)).strftime('%Y-%m-%d'),
+            'endDate': (start + datetime.timedelta(days=30 * i + 28)).strftime('%Y-%m-%d'),
+            'createdAt': _timestamp(rng, start, 30), 'updatedAt': _timestamp(rng, start, 700),
+            '_links': {
+                'self': _link('versions', i, f'Version {i}'),
+                'definingProject': _link('projects', project_id, f'Project {project_id}'),
+                'availableInProjects': {'href': f'{API}/versions/{i}/projects'},
+            },
+        }
+
+    def _work_packages(self, rng: random.Random, count: int, start) -> List[dict]:
+        return [self.work_package(rng, i, start) for i in range(1, count + 1)]
+
+    def work_package(self, rng: random.Random, i: int, start) -> dict:
+        project = rng.choice(self.projects)['id']
+        status = rng.choice(self.statuses)
+        type_ = rng.choice(self.types)
+        author = rng.randrange(1, len(self.users) + 1)
+        assignee = rng.randrange(1, len(self.users) + 1) if rng.random() < 0.7 else None
+        responsible = rng.randrange(1, len(self.users) + 1) if rng.random() < 0.3 else None
+        version = rng.randrange(1, len(self.versions) + 1) if self.versions and rng.random() < 0.5 else None
+        parent = rng.randrange(1, i) if i > 1 and rng.random() < 0.4 else None
+        priority = rng.randrange(1, len(PRIORITIES) + 1)
+        begin = start + datetime.timedelta(days=rng.randrange(700))
+        subject = f'Work package {i}'
+        return {
+            '_type': 'WorkPackage', 'id': i, 'lockVersion': rng.randrange(1, 20), 'subject': subject,
+            'description': {'format': 'markdown', 'raw': f'Description of {subject}',
+                            'html': f'<p class="op-uc-p">Description of {subject}</p>'},
+            'scheduleManually': False, 'readonly': False,
+            'startDate': begin.strftime('%Y-%m-%d'),
+            'dueDate': (begin + datetime.timedelta(days=rng.randrange(1, 30))).strftime('%Y-%m-%d'),
+            'derivedStartDate': None, 'derivedDueDate': None, 'duration': 'P5D',
+            'estimatedTime': f'PT{rng.randrange(1, 40)}H' if rng.random() < 0.6 else None,
+            'derivedEstimatedTime': None, 'spentTime': 'PT0S',
+            'percentageDone': rng.randrange(0, 101, 10),
+            'ignoreNonWorkingDays': False,
+            'createdAt': _timestamp(rng, start, 700), 'updatedAt': _timestamp(rng, start, 730),
+            'customField1': f'value {i % 17}', 'customField2': rng.randrange(1000),
+            '_links': {
+                'self': _link('work_packages', i, subject),
+                'update': {'href': f'{API}/work_packages/{i}/form', 'method': 'post'},
+                'schema': {'href': f'{API}/work_packages/schemas/{project}-{type_["id"]}'},
+                'attachments': {'href': f'{API}/work_packages/{i}/attachments'},
+                'activities': {'href': f'{API}/work_packages/{i}/activities'},
+                'relations': {'href': f'{API}/work_packages/{i}/relations'},
+                'watchers': {'href': f'{API}/work_packages/{i}/watchers'},
+                'revisions': {'href': f'{API}/work_packages/{i}/revisions'},
+                'category': {'href': None},
+                'type': _link('types', type_['id'], type_['name']),
+                'priority': _link('priorities', priority, PRIORITIES[priority - 1]),
+                'project': _link('projects', project, f'Project {project}'),
+                'status': _link('statuses', status['id'], status['name']),
+                'author': _link('users', author, f'User {author}'),
+                'responsible': _link('users', responsible, f'User {responsible}'),
+                'assignee': _link('users', assignee, f'User {assignee}'),
+                'version': _link('versions', version, f'Version {version}'),
+                'parent': _link('work_packages', parent, f'Work package {parent}'),
+                'customField3': {'href': None},
+            },
+        }
+
+    @staticmethod
+    def relation(rng: random.Random, i: int, work_packages: int) -> dict:
+        from_id = rng.randrange(1, work_packages)
+        to_id = rng.randrange(from_id + 1, work_packages + 1)
+        type_, reverse = RELATION_TYPES[rng.randrange(len(RELATION_TYPES))]
+        return {
+            '_type': 'Relation', 'id': i, 'name': type_, 'type': type_, 'reverseType': reverse,
+            'description': None, 'delay': 0 if type_ == 'precedes' else None,
+            '_links': {
+                'self': {'href': f'{API}/relations/{i}'},
+                'updateImmediately': {'href': f'{API}/relations/{i}', 'method': 'patch'},
+                'delete': {'href': f'{API}/relations/{i}', 'method': 'delete'},
+                'from': _link('work_packages', from_id, f'Work package {from_id}'),
+                'to': _link('work_packages', to_id, f'Work package {to_id}'),
+            },
+        }
+
+    def query(self, i: int) -> dict:
+        project = self.projects[(i - 1) % len(self.projects)]['id'] if self.projects else None
+        return {
+            '_type': 'Query', 'id': i, 'name': f'Query {i}', 'public': True, 'hidden': False,
+            'starred': False, 'sums': False, 'timelineVisible': False, 'showHierarchies': True,
+            'filters': [],
+            'createdAt': '2020-01-01T00:00:00Z', 'updatedAt': '2020-01-01T00:00:00Z',
+            '_links': {
+                'self': {'href': f'{API}/queries/{i}', 'title': f'Query {i}'},
+                'project': _link('projects', project, f'Project {project}'),
+                'user': _link('users', 1, 'User 1'),
+                'results': {'href': f'{API}/work_packages?query_id={i}'},
+            },
+        }
+
+    @staticmethod
+    def grid(rng: random.Random, i: int, start) -> dict:
+        widgets = [{
+            '_type': 'GridWidget', 'id': i * 100 + w, 'identifier': 'work_packages_table',
+            'startRow': w + 1, 'endRow': w + 2, 'startColumn': 1, 'endColumn': 3,
+            'options': {'name': f'Widget {w}', 'queryProps': {'columns[]': ['id', 'subject', 'status'],
+                                                              'filters': '[]', 'sortBy': '[["id","asc"]]'}},
+        } for w in range(rng.randrange(2, 8))]
+        return {
+            '_type': 'Grid', 'id': i, 'name': f'Grid {i}', 'rowCount': len(widgets) + 1, 'columnCount': 3,
+            'options': {}, 'widgets': widgets,
+            'createdAt': _timestamp(rng, start, 30), 'updatedAt': _timestamp(rng, start, 700),
+            '_links': {
+                'self': {'href': f'{API}/grids/{i}'},
+                'scope': {'href': f'/projects/project-{i}/overview', 'type': 'text/html'},
+                'updateImmediately': {'href': f'{API}/grids/{i}', 'method': 'patch'},
+            },
+        }
+
+    def embedded_work_package(self, wp: dict) -> dict:
+        """
+        work package as returned by GET work_packages/{id}, with the linked type, status,
+        project and users in _embedded
+        """
+        links = wp['_links']
+        embedded = {}
+        for name, kind in (('type', 'types'), ('status', 'statuses'), ('project', 'projects'),
+                           ('author', 'users'), ('assignee', 'users'), ('responsible', 'users'),
+                           ('version', 'versions')):
+            href = links[name]['href']
+            if href:
+                embedded[name] = self.by_id(kind)[int(href.rsplit('/', 1)[1])]
+
+        priority = int(links['priority']['href'].rsplit('/', 1)[1])
+        embedded['priority'] = {'_type': 'Priority', 'id': priority, 'name': PRIORITIES[priority - 1],
+                                'position': priority, 'isDefault': priority == 2, 'isActive': True,
+                                '_links': {'self': links['priority']}}
+        return dict(wp, _embedded=embedded)
@@ -0,0 +1,92 @@
+"""
+storing benchmark results as JSON and comparing them with a baseline
+"""
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import List
+
+import openproject_api_client as opc
+
+
+def environment() -> dict:
+    """
+    what the numbers depend on besides the code
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'json_backend': opc.JSON_BACKEND,
+        'commit': commit,
+    }
+
+
+def new_results(suite: str, config: dict) -> dict:
+    return {
+        'suite': suite,
+        'created': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'environment': environment(),
+        'config': config,
+        'benchmarks': {},
+    }
+
+
+def save(results: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, key: str, threshold: float = 0.1,
+            higher_is_better: bool = False) -> List[dict]:
+    """
+    compares the benchmarks present in both results
+
+    :param key: number of a benchmark compared, i.e. 'median' seconds
+    :param threshold: relative change counted as regression, 0.1 = 10% worse
+    :param higher_is_better: True for throughput, False for durations
+    :return: one row per benchmark with baseline, current, change and regressed
+    """
+    rows = []
+    for name, bench in sorted(current['benchmarks'].items()):
+        base = baseline['benchmarks'].get(name)
+        if base is None or not base.get(key) or bench.get(key) is None:
+            continue
+
+        change = bench[key] / base[key] - 1
+        worse = -change if higher_is_better else change
+        rows.append({
+            'name': name,
+            'baseline': base[key],
+            'current': bench[key],
+            'change': change,
+            'regressed': worse > threshold,
+        })
+
+    return rows
+
+
+def print_comparison(rows: List[dict], key: str, baseline: dict):
+    print(f"\ncompared with baseline of {baseline.get('created')} (commit {baseline['environment'].get('commit')}), {key}:")
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        print(f"  {row['name']:<32} {row['baseline']:>14.4g} -> {row['current']:<14.4g} {row['change']:+7.1%}{flag}")
+
+    if baseline.get('environment', {}).get('machine') != platform.machine() \
+            or baseline.get('environment', {}).get('python') != platform.python_version():
+        print('*warn* baseline was recorded on another machine or python version', file=sys.stderr)
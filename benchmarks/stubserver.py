@@ -0,0 +1,258 @@
+"""
+local HTTP server standing in for an OpenProject instance, serving a synthetic Dataset
+
+the server runs in its own process, so its CPU time does not compete with the client for
+the GIL. it answers with HTTP/1.1 keep-alive like a real instance behind a proxy.
+
+standalone usage:
+    python benchmarks/stubserver.py --port 8080 --work-packages 20000 --latency 50
+"""
+import argparse
+import json
+import multiprocessing
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from payloads import API, Dataset, collection
+
+_ROUTE = re.compile(r'^' + re.escape(API) + r'/([a-z_]+)(?:/(\d+))?(?:/([a-z_]+))?$')
+
+
+class StubApp(object):
+    """
+    answers GET requests of the API paths used by the client, from a Dataset
+    """
+
+    def __init__(self, dataset: Dataset, max_page_size: int = 1000):
+        """
+        :param max_page_size: page size cap, like the per_page setting of OpenProject
+        """
+        self.dataset = dataset
+        self.max_page_size = max_page_size
+        self.requests = 0
+
+        self._work_packages_of = {}
+        for wp in dataset.work_packages:
+            project = int(wp['_links']['project']['href'].rsplit('/', 1)[1])
+            self._work_packages_of.setdefault(project, []).append(wp)
+
+        # serialized bodies by request path, paging repeats the same requests every run
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def body(self, path: str):
+        """
+        :return: serialized body of a request path or None if not found
+        """
+        with self._lock:
+            self.requests += 1
+            data = self._bodies.get(path)
+        if data is not None:
+            return data
+
+        body = self._route(path)
+        if body is None:
+            return None
+
+        data = json.dumps(body, separators=(',', ':')).encode()
+        with self._lock:
+            self._bodies[path] = data
+        return data
+
+    def _route(self, path: str):
+        url = urlsplit(path)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        match = _ROUTE.match(url.path)
+        if match is None:
+            return None
+
+        kind, id_, sub = match.group(1), match.group(2), match.group(3)
+        d = self.dataset
+
+        if kind == 'projects' and id_ and sub == 'work_packages':
+            return self._collection(self._filter(self._work_packages_of.get(int(id_), []), query), url.path, query,
+                                    'WorkPackageCollection')
+        if sub is not None:
+            return None
+
+        if kind == 'queries' and id_:
+            query_obj = d.by_id('queries').get(int(id_))
+            if query_obj is None:
+                return None
+            return self._query(query_obj, query)
+
+        elements = {'projects': d.projects, 'work_packages': d.work_packages, 'relations': d.relations,
+                    'statuses': d.statuses, 'users': d.users, 'versions': d.versions, 'types': d.types,
+                    'grids': d.grids}.get(kind)
+        if elements is None:
+            return None
+
+        if id_:
+            return d.by_id(kind).get(int(id_))
+
+        type_ = 'WorkPackageCollection' if kind == 'work_packages' else 'Collection'
+        return self._collection(self._filter(elements, query), url.path, query, type_)
+
+    def _query(self, query_obj: dict, query: dict) -> dict:
+        results = self._collection(self.dataset.work_packages, f'{API}/work_packages', query,
+                                   'WorkPackageCollection')
+        results['_links']['self']['href'] = (f'{API}/work_packages?filters=%5B%5D&query_id={query_obj["id"]}'
+                                             f'&offset={results["offset"]}&pageSize={results["pageSize"]}')
+        return dict(query_obj, _embedded={'results': results})
+
+    def _collection(self, elements, href: str, query: dict, type_: str) -> dict:
+        if 'pageSize' not in query:
+            return collection(elements, href, type_)
+
+        page_size = min(int(query['pageSize']), self.max_page_size)
+        offset = max(int(query.get('offset', 1)), 1)
+        page = elements[(offset - 1) * page_size:offset * page_size]
+        return collection(page, href, type_, total=len(elements), page_size=page_size, offset=offset)
+
+    @staticmethod
+    def _filter(elements, query: dict):
+        if 'filters' not in query:
+            return elements
+
+        for f in json.loads(query['filters']):
+            for name, condition in f.items():
+                if name == 'id':
+                    ids = {int(v) for v in condition['values']}
+                    elements = [e for e in elements if e['id'] in ids]
+                elif name == 'updatedAt':
+                    elements = [e for e in elements if e['updatedAt'] >= condition['values'][0]]
+        return elements
+
+
+def make_server(app: StubApp, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """
+    :param latency: seconds every response is delayed, the network and server time of a real instance
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body are separate writes, with Nagle and delayed ACKs every keep-alive
+        # request would wait ~40 ms for the body
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+
+            data = app.body(self.path)
+            if data is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/hal+json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(dataset_options: dict, max_page_size: int, latency: float, host: str, port: int, connection):
+    app = StubApp(Dataset(**dataset_options), max_page_size)
+    server = make_server(app, host, port, latency)
+    connection.send(server.server_port)
+    server.serve_forever()
+
+
+class StubServer(object):
+    """
+    runs the stub in a child process
+
+    usage:
+        with StubServer({'work_packages': 20000}, latency=0.05) as server:
+            client = ApiClient(server.url, 'apikey')
+    """
+
+    def __init__(self, dataset_options: dict = None, max_page_size: int = 1000, latency: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        :param dataset_options: keyword arguments of Dataset
+        :param max_page_size: page size cap of the server
+        :param latency: seconds every response is delayed
+        """
+        self.dataset_options = dict(dataset_options or {})
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self._process = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/'
+
+    def start(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self.dataset_options, self.max_page_size, self.latency, self.host, self.port, child),
+            daemon=True)
+        self._process.start()
+        # generating the dataset takes a few seconds
+        if not parent.poll(300):
+            self.stop()
+            raise RuntimeError('stub server did not start')
+        self.port = parent.recv()
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--work-packages', type=int, default=20000)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=6, help='max. depth of the project hierarchy')
+    parser.add_argument('--relations', type=int, default=None, help='default: half the work packages')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def dataset_options(args) -> dict:
+    return {'work_packages': args.work_packages, 'projects': args.projects, 'depth': args.depth,
+            'relations': args.relations, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serves a synthetic OpenProject API v3')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of every response in ms')
+    parser.add_argument('--max-page-size', type=int, default=1000)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    app = StubApp(Dataset(**dataset_options(args)), args.max_page_size)
+    server = make_server(app, args.host, args.port, args.latency / 1000)
+    print(f'serving http://{args.host}:{server.server_port}{API}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
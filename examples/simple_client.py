@@ -21,7 +21,8 @@ client = opc.ApiClient(os.environ.get('OPENPROJECT_BASEURL'), os.environ.get('OP
 # #################################################################
 
 print(f"{ShellColors.OKGREEN}fetching all projects from server{ShellColors.ENDC}")
-projects_dict = client.get_projects_dict()
+project_tree = client.get_project_tree()
+projects_dict = project_tree.projects
 # projects = client.get_projects()
 
 print(f"{ShellColors.OKBLUE}print all projects sorted by full name/hierarchy:{ShellColors.ENDC}")
@@ -30,7 +31,7 @@ for project in sorted(projects_dict.values(), key=lambda o: o.fullname):
 
 print(f"{ShellColors.OKBLUE}print projects of a specific subtree, i.e. 54 (Innovations):{ShellColors.ENDC}")
 filterId = 54
-for project in [p for p in projects_dict.values() if filterId in p.path_ids]:
+for project in project_tree.subtree(filterId, include_self=False):
     print("{}".format(project.fullname))
 
 # workpackages
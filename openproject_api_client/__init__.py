@@ -1,3 +1,18 @@
 
 from .apiclient import *
-from .resources import *
\ No newline at end of file
+from .resources import *
+from .asyncclient import *
+from .cache import *
+from .sync import *
+from .projecttree import *
+from .relationindex import *
+from .graph import *
+from .compact import *
+from .jsonbackend import *
+from .columns import *
+from .identitymap import *
+from .refcache import *
+from .scheduler import *
+from .singleflight import *
+from .metrics import *
+from .tracing import *
@@ -1,22 +1,79 @@
+import datetime
 import json
-import sys
-from types import SimpleNamespace
-from typing import List
+import math
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+from urllib.parse import parse_qsl, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 # import types
 import openproject_api_client.resources as res
+from openproject_api_client.cache import ResponseCache
+from openproject_api_client.columns import WorkPackageColumns
+from openproject_api_client.compact import to_compact
+from openproject_api_client.identitymap import IdentityMap, link_href, link_hrefs
+from openproject_api_client.jsonbackend import json_loads, json_namespace
+from openproject_api_client.metrics import ClientMetrics, endpoint_template
+from openproject_api_client.projecttree import ProjectTree
+from openproject_api_client.refcache import REFERENCE_KINDS, ReferenceCache
+from openproject_api_client.scheduler import RequestScheduler
+from openproject_api_client.singleflight import SingleFlight, request_key
+from openproject_api_client import tracing
 
 
 # https://docs.openproject.org/api/
 
 # https://community.openproject.com/topics/7941
 
+class ResourcesById(dict):
+    """
+    resources keyed by id, `missing` lists the requested ids which were not returned
+    (not existing or not visible for the api user) in request order, `failed` the ids
+    whose request failed, they may exist
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing: List[int] = []
+        self.failed: List[int] = []
+
+
 class ApiClient(object):
 
-    def __init__(self, base_url, apikey):
+    def __init__(self, base_url, apikey, pool_size: int = 10, timeout=None, keep_alive: bool = True,
+                 workers: int = 1, cache: ResponseCache = None, compact: bool = False, lazy_dates: bool = False,
+                 reference_cache: ReferenceCache = None, scheduler: RequestScheduler = None,
+                 singleflight: SingleFlight = None, metrics: ClientMetrics = None):
+        """
+        create a client for an openproject instance
+
+        all requests share one connection pool, so connections (and TLS sessions) are reused
+        across calls. the client can be shared between threads, every thread gets its own
+        session on top of the shared pool, dropped when the thread ends. call close() or use the client as context manager
+        to release the connections.
+
+        :param base_url: url of the openproject instance
+        :param apikey: api key used for authentication
+        :param pool_size: max. number of connections kept open to the server
+        :param timeout: timeout in seconds passed to requests, either a float or a (connect, read) tuple
+        :param keep_alive: keep connections open between requests
+        :param workers: default number of pages fetched concurrently by get_paged_collection
+        :param cache: optional cache revalidating responses with conditional requests
+        :param compact: return elements of collections as compact, __slots__ based objects (see compact.py)
+        :param lazy_dates: keep timestamps and dates as strings until they are read (see resources.lazy_dates)
+        :param reference_cache: optional cache for statuses, users, versions and projects (see refcache.py)
+        :param scheduler: optional scheduler adapting concurrency and retrying throttled requests (see scheduler.py)
+        :param singleflight: optional coalescing of identical concurrent requests (see singleflight.py)
+        :param metrics: optional counters of requests, latency, bytes and decode time (see metrics.py)
+        """
 
         if not base_url:
             raise ApiError('base_url must not be null')
@@ -24,14 +81,93 @@ class ApiClient(object):
         if not apikey:
             raise ApiError('apikey must be set')
 
+        if pool_size < 1:
+            raise ApiError('pool_size must be at least 1')
+
+        if workers < 1:
+            raise ApiError('workers must be at least 1')
+
         self._rootpath = 'api/v3'
         self.base_url = base_url
         self.apikey = apikey
         self.auth = HTTPBasicAuth('apikey', apikey)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.workers = workers
+        self.cache = cache
+        self.compact = compact
+        self.lazy_dates = lazy_dates
+        self.reference_cache = reference_cache
+        self.scheduler = scheduler
+        self.singleflight = singleflight
+        self.metrics = metrics
+        # linked resources fetched by resolve(), keyed by href
+        self.identity_map = IdentityMap()
 
         if not self.base_url.endswith('/'):
             self.base_url += '/'
 
+        # tell the API we expect to parse JSON responses
+        self.headers = {
+            'Accept': 'application/json;charset=UTF-8',
+            'accept-encoding': 'identity, gzip',
+        }
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+        # one pool for all threads, sessions are per thread as they are not guaranteed to be thread safe
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._local = threading.local()
+        # session per live thread, entries of finished threads are dropped with the thread,
+        # so threads of short-lived executors do not pile up sessions
+        self._sessions = weakref.WeakKeyDictionary()
+        self._sessions_lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        closes all pooled connections, the client must not be used afterwards
+        """
+        with self._sessions_lock:
+            self._closed = True
+            sessions = list(self._sessions.values())
+            self._sessions = weakref.WeakKeyDictionary()
+
+        for session in sessions:
+            # do not let the session close the shared adapter, we do that once below
+            session.adapters.clear()
+            session.close()
+
+        self._adapter.close()
+
+    def _session(self) -> requests.Session:
+        """
+        get the session of the calling thread, sessions are created on first use and
+        mounted on the shared connection pool
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.auth = self.auth
+            session.headers.update(self.headers)
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+
+            with self._sessions_lock:
+                if self._closed:
+                    raise ApiError('client is closed')
+                self._sessions[threading.current_thread()] = session
+
+            self._local.session = session
+
+        return session
+
     # decorating function for error handling
     # def safe_request(fct):
     #     """ Return Go-like data (i.e. actual response and possible error) instead of raising errors. """
@@ -59,21 +195,63 @@ class ApiClient(object):
     # @safe_request
     def http_get(self, resource, payload=None):
         """ Perform an HTTP GET request against the given endpoint. """
+        with tracing.span('http_get', resource=resource) as span:
+            response = self._observed_http_get(resource, payload)
+            span.set(status=response.status_code, bytes=len(response.content))
+            return response
+
+    def _observed_http_get(self, resource, payload=None):
+        if self.metrics is None:
+            return self._http_get(resource, payload)
+
+        template = endpoint_template(resource)
+        start = time.perf_counter()
+        try:
+            response = self._http_get(resource, payload)
+        except requests.RequestException:
+            self.metrics.observe_request(template, 'error', time.perf_counter() - start)
+            raise
+
+        if getattr(response, 'from_cache', False):
+            # the server answered 304 without a body, the content came from memory
+            self.metrics.observe_request(template, 304, time.perf_counter() - start, 0, True)
+        else:
+            self.metrics.observe_request(template, response.status_code, time.perf_counter() - start,
+                                         len(response.content))
+        return response
+
+    def _http_get(self, resource, payload=None):
+        if self._closed:
+            raise ApiError('client is closed')
+
         # Avoid dangerous default function argument `{}`
         payload = payload or {}
         # versioning an API guarantees compatibility
         endpoint = '{}{}/{}'.format(self.base_url, self._rootpath, resource)
-        return requests.get(
+
+        if self.cache is None:
+            return self._send(
+                endpoint,
+                # attach parameters to the url, like `&foo=bar`
+                params=payload,
+            )
+
+        key = self.cache.key(endpoint, payload)
+        entry = self.cache.lookup(key)
+        response = self._send(
             endpoint,
-            # attach parameters to the url, like `&foo=bar`
             params=payload,
-            # tell the API we expect to parse JSON responses
-            headers={
-                'Accept': 'application/json;charset=UTF-8',
-                'accept-encoding': 'identity, gzip',
-            },
-            auth=self.auth
+            headers=entry.validators() if entry is not None else None,
         )
+        return self.cache.update(key, entry, response)
+
+    def _send(self, endpoint: str, params: dict, headers: dict = None) -> requests.Response:
+        session = self._session()
+        if self.scheduler is None:
+            return session.get(endpoint, params=params, headers=headers, timeout=self.timeout)
+
+        timeout = self.timeout if self.timeout is not None else self.scheduler.timeout
+        return self.scheduler.call(lambda: session.get(endpoint, params=params, headers=headers, timeout=timeout))
 
     def get(self, resource, payload=None):
         """
@@ -83,62 +261,224 @@ class ApiClient(object):
         :param payload:
         :return:
         """
+        if self.singleflight is None:
+            return self._get(resource, payload)
 
+        # identical requests in flight at the same time share one response
+        key = request_key(self.apikey, f"{self.base_url}{self._rootpath}/{resource}", payload)
+        return self.singleflight.do(key, lambda: self._get(resource, payload))
+
+    def _get(self, resource, payload=None):
         response = self.http_get(resource, payload)
 
         # if response.status_code == 200 and response.headers['content-type'] == 'application/json':
-        if response:
-            return self.decode_response(response)
-        else:
+        if not response:
             return None
 
-    def get_paged_collection(self, resource: str, payload: object = None, page_size: int = 5) -> List[res.GenericType]:
-        elements = []
+        if self.metrics is None:
+            return self._decode_response(response)
 
-        payload = payload or {}
+        start = time.perf_counter()
+        obj = self._decode_response(response)
+        self.metrics.observe_decode(type(obj).__name__, time.perf_counter() - start)
+        if isinstance(obj, res.Collection):
+            self.metrics.observe_page(endpoint_template(resource))
+
+        return obj
+
+    def get_paged_collection(self, resource: str, payload: object = None, page_size: int = 5,
+                             workers: int = None) -> List[res.GenericType]:
+        """
+        fetches all elements of a paged collection
+
+        with more than one worker the first page is fetched to learn total and page size,
+        the remaining pages are fetched concurrently. elements are returned in server order
+        in both modes.
+
+        :param resource: endpoint of the collection
+        :param payload: additional parameters, i.e. filters
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: list of all elements
+        """
+        return list(self.iter_paged_collection(resource, payload=payload, page_size=page_size, workers=workers))
+
+    def iter_paged_collection(self, resource: str, payload: object = None, page_size: int = 5,
+                              workers: int = None) -> Iterator[res.GenericType]:
+        """
+        like get_paged_collection, but yields the elements page by page instead of building
+        a list. a page is released as soon as its elements are consumed, with workers at most
+        `workers` pages are fetched ahead.
+
+        :param resource: endpoint of the collection
+        :param payload: additional parameters, i.e. filters
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: iterator over all elements
+        """
+        yield from self._iter_elements(self._iter_pages(resource, payload, page_size, workers))
+
+    def _iter_elements(self, pages: Iterator[res.Collection]) -> Iterator[res.GenericType]:
+        for collection in pages:
+            if self.metrics is not None:
+                # elements are decoded lazily, decode the page at once to measure it
+                start = time.perf_counter()
+                elements = list(map(to_compact, collection) if self.compact else collection)
+                if elements:
+                    self.metrics.observe_decode(type(elements[0]).__name__, time.perf_counter() - start,
+                                                len(elements))
+                yield from elements
+            elif self.compact:
+                yield from map(to_compact, collection)
+            else:
+                yield from collection
+
+    def _iter_pages(self, resource: str, payload: object, page_size: int, workers: int = None,
+                    first: res.Collection = None) -> Iterator[res.Collection]:
+        """
+        yields the pages of a collection in server order. nothing is yielded if the first page
+        fails, ApiError is raised if a later page fails.
+
+        :param first: already fetched first page, if given it is not fetched again
+        """
+        payload = dict(payload or {})
         payload.update({'pageSize': page_size})
 
+        workers = workers or self.workers
+        if workers > 1:
+            yield from self._iter_pages_parallel(resource, payload, page_size, workers, first)
+            return
+
         offset = 1
-        while True:
-            payload.update({'offset': offset})
-            collection = self.get(resource, payload=payload)
-            if collection:
-                elements += list(collection)
+        collection = first if first is not None else self._get_page(resource, payload, offset)
+        while collection:
+            yield collection
 
-                # some collections do not deliver pagesize and offset
-                effective_pagesize = page_size
-                if collection.pagesize is not None:
-                    effective_pagesize = collection.pagesize
+            # some collections do not deliver pagesize and offset
+            effective_pagesize = page_size
+            if collection.pagesize is not None:
+                effective_pagesize = collection.pagesize
 
-                effective_offset = offset
-                if collection.offset is not None:
-                    effective_offset = collection.offset
+            effective_offset = offset
+            if collection.offset is not None:
+                effective_offset = collection.offset
 
-                if collection.total < effective_offset * effective_pagesize:
-                    break
-                offset += 1
-            else:
+            if collection.total < effective_offset * effective_pagesize:
                 break
 
-        return elements
+            offset += 1
+            collection = self._get_page(resource, payload, offset)
+            if not collection:
+                raise self._page_error(resource, offset)
+
+    def _iter_pages_parallel(self, resource: str, payload: dict, page_size: int, workers: int,
+                             first: res.Collection = None) -> Iterator[res.Collection]:
+        collection = first if first is not None else self._get_page(resource, payload, 1)
+        if not collection:
+            return
+
+        pages = self._page_count(collection, page_size)
+        yield collection
+        if pages <= 1:
+            return
+
+        offsets = iter(range(2, pages + 1))
+        with ThreadPoolExecutor(max_workers=min(workers, pages - 1)) as executor:
+            # keep a window of pages in flight, consumed in order of their offsets
+            pending = deque((offset, executor.submit(self._get_page, resource, payload, offset))
+                            for offset in islice(offsets, workers))
+            try:
+                while pending:
+                    offset, future = pending.popleft()
+                    collection = future.result()
+                    # the page exists according to the first page, stopping here would truncate
+                    if not collection:
+                        raise self._page_error(resource, offset)
+
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        pending.append((offset, executor.submit(self._get_page, resource, payload, offset)))
+
+                    yield collection
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _page_error(resource: str, offset: int) -> 'ApiError':
+        return ApiError(f"page {offset} of '{resource}' could not be fetched")
+
+    def _get_page(self, resource: str, payload: dict, offset: int) -> res.Collection:
+        with tracing.span('page', resource=resource, offset=offset) as span:
+            collection = self.get(resource, payload=dict(payload, offset=offset))
+            if collection:
+                span.set(count=collection.count)
+            return collection
+
+    @staticmethod
+    def _page_count(collection, page_size: int) -> int:
+        """
+        number of pages of a collection, calculated from its first page
+        """
+        # some collections do not deliver pagesize and offset
+        effective_pagesize = page_size
+        if collection.pagesize is not None:
+            effective_pagesize = collection.pagesize
+
+        if not collection.total or effective_pagesize <= 0:
+            return 1
+
+        return max(1, math.ceil(collection.total / effective_pagesize))
+
+    def _decode_response(self, response):
+        if not self.lazy_dates:
+            return self.decode_response(response)
+
+        with res.lazy_dates():
+            return self.decode_response(response)
 
     @staticmethod
     def decode_response(response):
-        try:
-            # try to decode json object depending on type
-            return ApiClient.decode(response.json())
+        return ApiClient.decode_content(response.content)
 
-        except:
-            # return as SimpleNamespace object if no type info found
-            return json.loads(response.text, object_hook=lambda d: SimpleNamespace(**d))
+    @staticmethod
+    def decode_content(content):
+        """
+        parses a response body once and decodes it depending on its type
+
+        :param content: raw body (bytes)
+        :return: resource object, SimpleNamespace objects if the body has no type info
+        """
+        with tracing.span('json_loads', bytes=len(content)):
+            json_object = json_loads(content)
+        if isinstance(json_object, dict) and '_type' in json_object:
+            try:
+                # decode json object depending on type
+                return ApiClient.decode(json_object)
+            except Exception as e:
+                print(f"*warn* unable to decode type {json_object['_type']}, using SimpleNamespace, error was: {e!r}")
+
+        # return as SimpleNamespace object if no type info found
+        return json_namespace(json_object)
 
     @staticmethod
     def decode(json_object) -> res.GenericType:
+        # called per collection element, skip the span entirely if tracing is off
+        if tracing.get_tracer() is None:
+            return ApiClient._decode(json_object)
+
+        with tracing.span('decode', type=json_object.get('_type')):
+            return ApiClient._decode(json_object)
 
+    @staticmethod
+    def _decode(json_object) -> res.GenericType:
         # if we have a type info, use a specialized class for it
         if '_type' in json_object:
             try:
-                clazz = getattr(sys.modules['openproject_api_client.resources'], json_object['_type'])
+                clazz = res.TYPE_REGISTRY.get(json_object['_type'])
+                if clazz is None:
+                    raise AttributeError(f"no class registered for type '{json_object['_type']}'")
+
                 obj = clazz(json_object)
                 return obj
 
@@ -166,28 +506,183 @@ class ApiClient(object):
 
         :return: dict of all project with id as key
         """
-        projects = self.get_paged_collection('projects', page_size=100)
-        project_map = {}
-        for p in projects:
-            project_map[p.id] = p
-
-        for i in project_map:
-            p = project_map[i]
+        return dict(self.get_project_tree().projects)
 
-            while p.parent_id:
-                project_map[i].path_ids.insert(0, p.parent_id)
-                project_map[i].path.insert(0, project_map[p.parent_id].name)
+    def get_project_tree(self) -> ProjectTree:
+        """
+        get all projects as tree, with path, level and fullname filled
 
-                p = project_map[p.parent_id]
+        with a reference cache the tree is shared until it expires, get_projects() and
+        get_projects_dict() use the same tree.
 
-            project_map[i].level = len(project_map[i].path_ids) + 1
-            project_map[i].fullname = '/'.join(project_map[i].path + [project_map[i].name])
+        :return: ProjectTree of all projects, the projects dict is available as its `projects` attribute
+        :raises ApiError: if the projects could not be loaded
+        """
+        return self._loaded_reference('projects')
 
-        return project_map
+    @staticmethod
+    def _build_project_tree(projects: List[res.Project]) -> ProjectTree:
+        """
+        builds the project tree and fills path, level and fullname of every project
+        """
+        with tracing.span('project_tree', projects=len(projects)):
+            tree = ProjectTree(projects)
+            tree.apply()
+            return tree
 
     def get_workpackage(self, workpackage_id: int) -> res.WorkPackage:
         return self.get(f"work_packages/{workpackage_id}")
 
+    def get_workpackages_by_ids(self, ids: Iterable[int], chunk_size: int = 200,
+                                workers: int = None) -> ResourcesById:
+        """
+        fetches workpackages of all states by id, with one filtered collection request per chunk
+        of ids instead of one request per id
+
+        :param ids: ids to fetch, duplicates are fetched once
+        :param chunk_size: ids per request, limited by the url length the server accepts
+        :param workers: number of chunks fetched concurrently, defaults to pool_size
+        :return: workpackages keyed by id, ids not returned by the server in `missing`, ids of
+            failed requests in `failed`
+        """
+        chunks = self._id_chunks(ids, chunk_size)
+        result = ResourcesById()
+        if not chunks:
+            return result
+
+        def fetch(chunk):
+            payload = dict(self._id_filter_payload(chunk), pageSize=len(chunk))
+            first = self._get_page("work_packages", payload, 1)
+            if not first:
+                return None
+
+            return list(self._iter_elements(self._iter_pages("work_packages", payload, len(chunk), workers=1,
+                                                             first=first)))
+
+        workers = min(workers or self.pool_size, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages = list(executor.map(fetch, chunks))
+        else:
+            pages = [fetch(chunk) for chunk in chunks]
+
+        for chunk, page in zip(chunks, pages):
+            if page is None:
+                result.failed += chunk
+                continue
+
+            for wp in page:
+                result[wp.id] = wp
+            result.missing += [i for i in chunk if i not in result]
+
+        return result
+
+    @staticmethod
+    def _id_chunks(ids: Iterable[int], chunk_size: int) -> List[List[int]]:
+        if chunk_size < 1:
+            raise ApiError('chunk_size must be at least 1')
+
+        # dedupe, keeping the order of the first occurrence
+        unique = list(dict.fromkeys(int(i) for i in ids))
+        return [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+    @staticmethod
+    def _id_filter_payload(ids: List[int], all_states: bool = True) -> dict:
+        filters = [{"id": {"operator": "=", "values": [str(i) for i in ids]}}]
+        if all_states:
+            filters.append({"status_id": {"operator": "*", "values": None}})
+
+        return {'filters': json.dumps(filters)}
+
+    def resolve(self, resources: Iterable[res.GenericType], names: Iterable[str] = None,
+                workers: int = None) -> Dict[str, res.GenericType]:
+        """
+        fetches the resources linked by a batch of resources, each one once
+
+        linked hrefs are collected from the id attributes (i.e. assignee_id / assignee_type), see
+        identitymap.LINKS. hrefs not yet in the identity map are fetched in bulk where the api
+        allows it (workpackages, projects and users by id filter, all statuses and types at once),
+        the rest one by one. fetched resources are kept in `identity_map`, so repeated calls and
+        linked() return the same instances.
+
+        :param resources: resources whose links are resolved, i.e. workpackages of a report
+        :param names: link names to resolve, i.e. ('assignee', 'version'), defaults to all
+        :param workers: number of single requests made concurrently, defaults to pool_size
+        :return: linked resources keyed by href, hrefs which could not be fetched are left out
+        """
+        hrefs = link_hrefs(resources, names, self._rootpath)
+
+        # group the hrefs not fetched yet by kind
+        wanted: Dict[str, List[int]] = {}
+        for href in hrefs:
+            if href not in self.identity_map:
+                _, kind, linked_id = res._split_href(href)
+                wanted.setdefault(kind, []).append(int(linked_id))
+
+        for kind, ids in wanted.items():
+            for obj in self._fetch_bulk(kind, ids):
+                if isinstance(obj, res.GenericType) and obj.id is not None:
+                    self.identity_map.add(self._href(kind, obj.id), obj)
+
+        single = [href for href in hrefs if href not in self.identity_map]
+        if single:
+            def fetch(href):
+                obj = self.get(href[len(self._rootpath) + 2:])
+                if isinstance(obj, res.GenericType):
+                    self.identity_map.add(href, to_compact(obj) if self.compact else obj)
+
+            workers = min(workers or self.pool_size, len(single))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(fetch, single))
+            else:
+                for href in single:
+                    fetch(href)
+
+        resolved = {}
+        for href in hrefs:
+            obj = self.identity_map.get(href)
+            if obj is not None:
+                resolved[href] = obj
+
+        return resolved
+
+    def linked(self, resource: res.GenericType, name: str) -> res.GenericType:
+        """
+        the resource linked as `name` (i.e. 'assignee'), from the identity map or fetched
+
+        :return: linked resource or None if the link is not set or could not be fetched
+        """
+        href = link_href(resource, name, self._rootpath)
+        if href is None:
+            return None
+
+        obj = self.identity_map.get(href)
+        if obj is None:
+            obj = self.resolve([resource], [name]).get(href)
+
+        return obj
+
+    def _href(self, kind: str, linked_id: int) -> str:
+        return f"/{self._rootpath}/{kind}/{linked_id}"
+
+    def _fetch_bulk(self, kind: str, ids: List[int]) -> List[res.GenericType]:
+        # an empty result (i.e. listing users needs admin permissions) leaves the ids to single requests
+        if kind == 'work_packages':
+            return list(self.get_workpackages_by_ids(ids).values())
+
+        if kind in ('statuses', 'types'):
+            return self.get_paged_collection(kind, page_size=100)
+
+        if kind in ('projects', 'users'):
+            elements = []
+            for chunk in self._id_chunks(ids, 200):
+                elements += self.get_paged_collection(kind, self._id_filter_payload(chunk, all_states=False),
+                                                      page_size=len(chunk))
+            return elements
+
+        return []
+
     def get_workpackages(self):
         raise NotImplemented
 
@@ -204,6 +699,78 @@ class ApiClient(object):
         :return: returns list of workpackages of requested project and filter
         :rtype: List[WorkPackage]
         """
+        return list(self.iter_workpackages_by_project_id(project_id, status=status, status_ids=status_ids, page_size=page_size))
+
+    def iter_workpackages_by_project_id(self, project_id: int, status: str = None, status_ids: List[int] = None, page_size=100) -> Iterator[res.WorkPackage]:
+        """
+        like get_workpackages_by_project_id, but yields the workpackages page by page
+
+        :param project_id: project to list workpackages for
+        :param status: one of 'all', 'open' (default), 'closed' ; overrides status_ids
+        :param status_ids: list of status ids used to filter ; when using status must not be set
+        :return: iterator over workpackages of requested project and filter
+        """
+        payload = self._status_filter_payload(status, status_ids)
+        return self.iter_paged_collection(f"projects/{project_id}/work_packages", page_size=page_size, payload=payload)
+
+    def get_workpackage_columns(self, project_id: int, status: str = None, status_ids: List[int] = None,
+                                page_size: int = 100, workers: int = None) -> WorkPackageColumns:
+        """
+        workpackages of a project as columns (ids, dates, estimates), see WorkPackageColumns
+
+        the columns are filled from the raw json of each page, no WorkPackage objects are created
+
+        :param project_id: project to list workpackages for
+        :param status: one of 'all', 'open' (default), 'closed' ; overrides status_ids
+        :param status_ids: list of status ids used to filter ; when using status must not be set
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        """
+        payload = self._status_filter_payload(status, status_ids)
+        columns = WorkPackageColumns()
+        for collection in self._iter_pages(f"projects/{project_id}/work_packages", payload, page_size, workers):
+            columns.extend(collection.raw_elements())
+
+        return columns
+
+    def iter_workpackages_updated_since(self, since=None, project_id: int = None, page_size: int = 100,
+                                        workers: int = None) -> Iterator[res.WorkPackage]:
+        """
+        yields workpackages of all states updated at or after `since`, oldest change first
+
+        :param since: datetime (naive values are taken as UTC) or ISO 8601 string, None for all
+        :param project_id: restrict to a project, None for all projects
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: iterator over changed workpackages
+        """
+        return self._iter_elements(self._iter_pages_updated_since(since, project_id, page_size, workers))
+
+    def _iter_pages_updated_since(self, since, project_id: int, page_size: int,
+                                  workers: int = None) -> Iterator[res.WorkPackageCollection]:
+        filters = [{"status_id": {"operator": "*", "values": None}}]
+        if since is not None:
+            filters.append({"updatedAt": {"operator": "<>d", "values": [self._format_timestamp(since), ""]}})
+
+        payload = {
+            'filters': json.dumps(filters),
+            # id breaks ties between equal timestamps, so the order is the same on every page
+            'sortBy': json.dumps([["updatedAt", "asc"], ["id", "asc"]]),
+        }
+
+        resource = f"projects/{project_id}/work_packages" if project_id is not None else "work_packages"
+        return self._iter_pages(resource, payload, page_size, workers)
+
+    @staticmethod
+    def _format_timestamp(value) -> str:
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(datetime.timezone.utc)
+            return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        return str(value)
+
+    @staticmethod
+    def _status_filter_payload(status: str = None, status_ids: List[int] = None) -> dict:
         # build filter
         filters = []
         if status is not None:
@@ -223,29 +790,75 @@ class ApiClient(object):
         if len(filters):
             payload.update({'filters': json.dumps(filters)})
 
-        return self.get_paged_collection(f"projects/{project_id}/work_packages", page_size=page_size, payload=payload)
+        return payload
+
+    def get_workpackages_by_query_id(self, query_id: int, page_size: int = 100, workers: int = None) -> List[res.WorkPackage]:
+        """
+        fetches the workpackages of a saved query
+
+        the query is fetched once, the remaining pages are fetched from its results collection
+        directly, so the query itself is not transferred and decoded again for every page.
 
-    def get_workpackages_by_query_id(self, query_id: int) -> List[res.WorkPackage]:
-        workpackages = []
-        page_size = 10
-        payload={'pageSize': page_size}
+        :param query_id: id of the query
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: list of workpackages in order of the query
+        """
+        return list(self.iter_workpackages_by_query_id(query_id, page_size=page_size, workers=workers))
+
+    def iter_workpackages_by_query_id(self, query_id: int, page_size: int = 100, workers: int = None) -> Iterator[res.WorkPackage]:
+        """
+        like get_workpackages_by_query_id, but yields the workpackages page by page
+        """
+        query = self.get(f"queries/{query_id}", payload={'pageSize': page_size, 'offset': 1})
+        if not query or not isinstance(query.results, res.WorkPackageCollection):
+            return
+
+        first = query.results
+        # drop the query, it keeps its raw json for debugging
+        del query
+
+        location = self._split_href(first.href, self._rootpath)
+        if location is None:
+            # results without usable self link, page over the query resource
+            yield from self._iter_elements(self._iter_query_pages_legacy(query_id, first, page_size))
+            return
+
+        resource, payload = location
+        yield from self._iter_elements(self._iter_pages(resource, payload, page_size, workers, first=first))
+
+    def _iter_query_pages_legacy(self, query_id: int, first: res.WorkPackageCollection, page_size: int) -> Iterator[res.WorkPackageCollection]:
+        collection = first
         offset = 1
+        yield collection
+        while collection.total >= collection.offset * collection.pagesize:
+            offset += 1
+            result = self.get(f"queries/{query_id}", payload={'pageSize': page_size, 'offset': offset})
+            if not result or not isinstance(result.results, res.WorkPackageCollection):
+                raise self._page_error(f"queries/{query_id}", offset)
 
-        while True:
-            payload.update({'offset': offset})
-            result = self.get(f"queries/{query_id}", payload=payload)
-            if result:
-                collection = result.results
-                if isinstance(collection, res.WorkPackageCollection):
-                    workpackages += list(result.results)
-                    if collection.total < collection.offset * collection.pagesize:
-                        break
-                    offset += 1
-                else:
-                    break
-            else:
-                break
-        return workpackages
+            collection = result.results
+            yield collection
+
+    @staticmethod
+    def _split_href(href: str, rootpath: str):
+        """
+        splits a HAL href like /api/v3/projects/1/work_packages?filters=... into
+        resource and parameters, paging parameters are removed
+
+        :return: tuple of resource and payload or None if href is not an api href
+        """
+        if not href:
+            return None
+
+        url = urlsplit(href)
+        marker = f"/{rootpath}/"
+        if marker not in url.path:
+            return None
+
+        resource = url.path.split(marker, 1)[1]
+        payload = {k: v for k, v in parse_qsl(url.query, keep_blank_values=True) if k not in ('offset', 'pageSize')}
+        return resource, payload
 
     def get_relation(self, relation_id: int) -> res.Relation:
         return self.get(f"relations/{relation_id}")
@@ -257,25 +870,17 @@ class ApiClient(object):
 
         return None
 
-    def get_version(self, version_id: int) -> res.Version:
-        return self.get(f"versions/{version_id}")
-
-    def get_versions(self) -> List[res.Version]:
-        result = self.get_paged_collection(f"versions", page_size=100)
-
-        if result:
-            return (list(result))
-
-        return None
+    def iter_relations(self, page_size: int = 500) -> Iterator[res.Relation]:
+        return self.iter_paged_collection(f"relations", page_size=page_size)
 
     def get_user(self, user_id: int) -> res.User:
         return self.get(f"users/{user_id}")
 
     def get_users(self) -> List[res.User]:
-        result = self.get_paged_collection(f"users", page_size=100)
+        result = self._reference('users')
 
         if result:
-            return (list(result))
+            return list(result.values())
 
         return None
 
@@ -283,10 +888,10 @@ class ApiClient(object):
         return self.get(f"placeholder_users/{user_id}")
 
     def get_placeholder_users(self) -> List[res.PlaceholderUser]:
-        result = self.get_paged_collection(f"placeholder_users", page_size=100)
+        result = self._reference('placeholder_users')
 
         if result:
-            return (list(result))
+            return list(result.values())
 
         return None
 
@@ -305,10 +910,10 @@ class ApiClient(object):
         return self.get(f"statuses/{id}")
 
     def get_statuses(self) -> List[res.Status]:
-        result = self.get_paged_collection(f"statuses", page_size=100)
+        result = self._reference('statuses')
 
         if result:
-            return (list(result))
+            return list(result.values())
 
         return None
 
@@ -316,13 +921,106 @@ class ApiClient(object):
         return self.get(f"versions/{id}")
 
     def get_versions(self) -> List[res.Version]:
-        result = self.get_paged_collection(f"versions", page_size=100)
+        result = self._reference('versions')
 
         if result:
-            return (list(result))
+            return list(result.values())
 
         return None
 
+    # reference data, served by the reference cache if one is configured
+    # ###################################################
+
+    def lookup_status(self, status_id: int) -> res.Status:
+        """
+        status by id from the reference data, no request while the cached statuses are fresh.
+        without reference cache every call loads all statuses.
+
+        :return: status or None if there is no status with this id
+        :raises ApiError: if the statuses could not be loaded
+        """
+        return self._loaded_reference('statuses').get(status_id)
+
+    def lookup_user(self, user_id: int) -> res.User:
+        """
+        user by id from the reference data, see lookup_status()
+        """
+        return self._loaded_reference('users').get(user_id)
+
+    def lookup_placeholder_user(self, user_id: int) -> res.PlaceholderUser:
+        """
+        placeholder user by id from the reference data, see lookup_status()
+        """
+        return self._loaded_reference('placeholder_users').get(user_id)
+
+    def lookup_version(self, version_id: int) -> res.Version:
+        """
+        version by id from the reference data, see lookup_status()
+        """
+        return self._loaded_reference('versions').get(version_id)
+
+    def lookup_project(self, project_id: int) -> res.Project:
+        """
+        project by id from the reference data, see lookup_status()
+        """
+        return self._loaded_reference('projects').projects.get(project_id)
+
+    def preload_reference_data(self, kinds: Iterable[str] = REFERENCE_KINDS, workers: int = None):
+        """
+        loads reference data into the reference cache concurrently, i.e. at startup
+
+        :param kinds: kinds to load, see refcache.REFERENCE_KINDS
+        :param workers: number of kinds loaded concurrently, defaults to pool_size
+        """
+        if self.reference_cache is None:
+            raise ApiError('preload_reference_data requires a reference_cache')
+
+        kinds = list(kinds)
+        for kind in kinds:
+            if kind not in REFERENCE_KINDS:
+                raise ApiError(f"unknown reference data '{kind}'")
+
+        workers = min(workers or self.pool_size, len(kinds))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                loaded = list(executor.map(self._reference, kinds))
+        else:
+            loaded = [self._reference(kind) for kind in kinds]
+
+        for kind, result in zip(kinds, loaded):
+            if result is None:
+                # not cached, loaded again on the next access
+                print(f"*warn* unable to load reference data '{kind}'")
+
+    def _reference(self, kind: str):
+        """
+        :return: reference data of a kind, None if it could not be loaded
+        """
+        if self.reference_cache is None:
+            return self._load_reference(kind)
+
+        return self.reference_cache.get(kind, lambda: self._load_reference(kind))
+
+    def _loaded_reference(self, kind: str):
+        result = self._reference(kind)
+        if result is None:
+            raise ApiError(f"reference data '{kind}' could not be loaded")
+
+        return result
+
+    def _load_reference(self, kind: str):
+        # a failed request must not look like an empty collection, it would be cached
+        payload = {'pageSize': 100}
+        first = self._get_page(kind, payload, 1)
+        if not first:
+            return None
+
+        elements = list(self._iter_elements(self._iter_pages(kind, payload, 100, first=first)))
+        if kind == 'projects':
+            return self._build_project_tree(elements)
+
+        return {obj.id: obj for obj in elements}
+
     def get_grid(self, grid_id: int) -> res.Grid:
         return self.get(f"grids/{grid_id}")
 
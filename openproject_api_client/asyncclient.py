@@ -0,0 +1,420 @@
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Iterable, List
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+# import types
+import openproject_api_client.resources as res
+from openproject_api_client.apiclient import ApiClient, ApiError, ResourcesById
+from openproject_api_client.columns import WorkPackageColumns
+from openproject_api_client.projecttree import ProjectTree
+from openproject_api_client.singleflight import AsyncSingleFlight, request_key
+
+
+class AsyncApiClient(object):
+    """
+    asyncio variant of ApiClient, provides the same methods as coroutines
+
+    all requests share one aiohttp connection pool, the number of requests in flight is
+    capped by a semaphore. decoding is done by the same resource classes as ApiClient.
+
+    requires aiohttp, install with `pip install openproject-api-client[async]`
+    """
+
+    def __init__(self, base_url, apikey, pool_size: int = 10, timeout=None, keep_alive: bool = True,
+                 workers: int = 1, max_concurrency: int = None, singleflight: AsyncSingleFlight = None):
+        """
+        create an asyncio client for an openproject instance
+
+        :param base_url: url of the openproject instance
+        :param apikey: api key used for authentication
+        :param pool_size: max. number of connections kept open to the server
+        :param timeout: total timeout of a request in seconds
+        :param keep_alive: keep connections open between requests
+        :param workers: default number of pages fetched concurrently by get_paged_collection
+        :param max_concurrency: max. number of requests in flight, defaults to pool_size
+        :param singleflight: optional coalescing of identical concurrent requests (see singleflight.py)
+        """
+        if aiohttp is None:
+            raise ApiError('AsyncApiClient requires aiohttp, install openproject-api-client[async]')
+
+        if not base_url:
+            raise ApiError('base_url must not be null')
+
+        if not apikey:
+            raise ApiError('apikey must be set')
+
+        if pool_size < 1:
+            raise ApiError('pool_size must be at least 1')
+
+        if workers < 1:
+            raise ApiError('workers must be at least 1')
+
+        self._rootpath = 'api/v3'
+        self.base_url = base_url
+        self.apikey = apikey
+        self.auth = aiohttp.BasicAuth('apikey', apikey)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.workers = workers
+        self.max_concurrency = max_concurrency or pool_size
+        self.singleflight = singleflight
+
+        if not self.base_url.endswith('/'):
+            self.base_url += '/'
+
+        # tell the API we expect to parse JSON responses
+        self.headers = {
+            'Accept': 'application/json;charset=UTF-8',
+            'accept-encoding': 'identity, gzip',
+        }
+
+        # session and semaphore are bound to the running loop, so they are created on first use
+        self._session = None
+        self._semaphore = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        closes all pooled connections, the client must not be used afterwards
+        """
+        self._closed = True
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._closed:
+            raise ApiError('client is closed')
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                auth=self.auth,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self._session
+
+    async def http_get(self, resource, payload=None):
+        """
+        Perform an HTTP GET request against the given endpoint.
+
+        aiohttp responses can not be read after the connection is released, so the body is
+        read here and returned along with the response.
+
+        :return: tuple of response and body
+        """
+        session = self._get_session()
+
+        # Avoid dangerous default function argument `{}`
+        payload = payload or {}
+        # aiohttp only accepts strings and numbers as parameters, requests drops None values
+        params = {k: v if isinstance(v, (str, int, float)) and not isinstance(v, bool) else str(v)
+                  for k, v in payload.items() if v is not None}
+
+        # versioning an API guarantees compatibility
+        endpoint = '{}{}/{}'.format(self.base_url, self._rootpath, resource)
+        async with self._semaphore:
+            async with session.get(endpoint, params=params) as response:
+                return response, await response.read()
+
+    async def get(self, resource, payload=None):
+        """
+        a get method for a generic endpoint
+
+        :param resource:
+        :param payload:
+        :return:
+        """
+        if self.singleflight is None:
+            return await self._get(resource, payload)
+
+        # identical requests in flight at the same time share one response
+        key = request_key(self.apikey, f"{self.base_url}{self._rootpath}/{resource}", payload)
+        return await self.singleflight.do(key, lambda: self._get(resource, payload))
+
+    async def _get(self, resource, payload=None):
+        response, content = await self.http_get(resource, payload)
+
+        if response.status < 400:
+            return self.decode_content(content)
+        else:
+            return None
+
+    @staticmethod
+    def decode_content(content: bytes):
+        return ApiClient.decode_content(content)
+
+    async def get_paged_collection(self, resource: str, payload: object = None, page_size: int = 5,
+                                   workers: int = None) -> List[res.GenericType]:
+        """
+        fetches all elements of a paged collection, see ApiClient.get_paged_collection
+
+        :param resource: endpoint of the collection
+        :param payload: additional parameters, i.e. filters
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: list of all elements
+        """
+        elements = []
+        async for collection in self._iter_pages(resource, payload, page_size, workers):
+            elements += list(collection)
+
+        return elements
+
+    async def iter_paged_collection(self, resource: str, payload: object = None, page_size: int = 5,
+                                    workers: int = None) -> AsyncIterator[res.GenericType]:
+        """
+        like get_paged_collection, but yields the elements page by page
+
+        :param resource: endpoint of the collection
+        :param payload: additional parameters, i.e. filters
+        :param page_size: requested page size, the server may cap it
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: async iterator over all elements
+        """
+        async for collection in self._iter_pages(resource, payload, page_size, workers):
+            for element in collection:
+                yield element
+
+    async def _iter_pages(self, resource: str, payload: object, page_size: int, workers: int = None,
+                          first: res.Collection = None) -> AsyncIterator[res.Collection]:
+        payload = dict(payload or {})
+        payload.update({'pageSize': page_size})
+
+        collection = first if first is not None else await self.get(resource, payload=dict(payload, offset=1))
+        if not collection:
+            return
+
+        pages = ApiClient._page_count(collection, page_size)
+        yield collection
+
+        def fetch(offset):
+            return offset, asyncio.ensure_future(self.get(resource, payload=dict(payload, offset=offset)))
+
+        # keep a window of pages in flight, consumed in order of their offsets
+        workers = workers or self.workers
+        pending = deque()
+        next_offset = 2
+        while next_offset <= pages and len(pending) < workers:
+            pending.append(fetch(next_offset))
+            next_offset += 1
+
+        try:
+            while pending:
+                offset, task = pending.popleft()
+                collection = await task
+                # the page exists according to the first page, stopping here would truncate
+                if not collection:
+                    raise ApiClient._page_error(resource, offset)
+
+                if next_offset <= pages:
+                    pending.append(fetch(next_offset))
+                    next_offset += 1
+
+                yield collection
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def _get_list(self, resource: str, page_size: int = 100, payload: object = None):
+        result = await self.get_paged_collection(resource, page_size=page_size, payload=payload)
+
+        if result:
+            return (list(result))
+
+        return None
+
+    # methods for specific/convenient access to endpoints
+    # ###################################################
+
+    async def get_projects(self) -> List[res.Project]:
+        """
+        get an array of all projects
+
+        :return: returns list of all projects
+        """
+        return list((await self.get_projects_dict()).values())
+
+    async def get_projects_dict(self):
+        """
+        get all projects as dict
+
+        :return: dict of all project with id as key
+        """
+        return (await self.get_project_tree()).projects
+
+    async def get_project_tree(self) -> ProjectTree:
+        """
+        get all projects as tree, see ApiClient.get_project_tree
+        """
+        projects = await self.get_paged_collection('projects', page_size=100)
+        return ApiClient._build_project_tree(projects)
+
+    async def get_workpackage(self, workpackage_id: int) -> res.WorkPackage:
+        return await self.get(f"work_packages/{workpackage_id}")
+
+    async def get_workpackages_by_ids(self, ids: Iterable[int], chunk_size: int = 200) -> ResourcesById:
+        """
+        fetches workpackages by id, see ApiClient.get_workpackages_by_ids
+
+        all chunks are requested at once, the number in flight is capped by max_concurrency
+        """
+        chunks = ApiClient._id_chunks(ids, chunk_size)
+
+        async def fetch(chunk):
+            payload = dict(ApiClient._id_filter_payload(chunk), pageSize=len(chunk))
+            first = await self.get("work_packages", payload=dict(payload, offset=1))
+            if not first:
+                return None
+
+            return [wp async for collection in self._iter_pages("work_packages", payload, len(chunk), workers=1,
+                                                                first=first)
+                    for wp in collection]
+
+        pages = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+
+        result = ResourcesById()
+        for chunk, page in zip(chunks, pages):
+            if page is None:
+                result.failed += chunk
+                continue
+
+            for wp in page:
+                result[wp.id] = wp
+            result.missing += [i for i in chunk if i not in result]
+
+        return result
+
+    async def get_workpackages_by_project_id(self, project_id: int, status: str = None, status_ids: List[int] = None, page_size=100) -> List[res.WorkPackage]:
+        """
+        fetched workpackages for a specific projects, see ApiClient.get_workpackages_by_project_id
+        """
+        payload = ApiClient._status_filter_payload(status, status_ids)
+        return await self.get_paged_collection(f"projects/{project_id}/work_packages", page_size=page_size, payload=payload)
+
+    def iter_workpackages_by_project_id(self, project_id: int, status: str = None, status_ids: List[int] = None, page_size=100) -> AsyncIterator[res.WorkPackage]:
+        payload = ApiClient._status_filter_payload(status, status_ids)
+        return self.iter_paged_collection(f"projects/{project_id}/work_packages", page_size=page_size, payload=payload)
+
+    async def get_workpackage_columns(self, project_id: int, status: str = None, status_ids: List[int] = None,
+                                      page_size: int = 100, workers: int = None) -> WorkPackageColumns:
+        """
+        workpackages of a project as columns, see ApiClient.get_workpackage_columns
+        """
+        payload = ApiClient._status_filter_payload(status, status_ids)
+        columns = WorkPackageColumns()
+        async for collection in self._iter_pages(f"projects/{project_id}/work_packages", payload, page_size, workers):
+            columns.extend(collection.raw_elements())
+
+        return columns
+
+    async def get_workpackages_by_query_id(self, query_id: int, page_size: int = 100, workers: int = None) -> List[res.WorkPackage]:
+        """
+        fetches the workpackages of a saved query, see ApiClient.get_workpackages_by_query_id
+        """
+        return [wp async for wp in self.iter_workpackages_by_query_id(query_id, page_size=page_size, workers=workers)]
+
+    async def iter_workpackages_by_query_id(self, query_id: int, page_size: int = 100, workers: int = None) -> AsyncIterator[res.WorkPackage]:
+        query = await self.get(f"queries/{query_id}", payload={'pageSize': page_size, 'offset': 1})
+        if not query or not isinstance(query.results, res.WorkPackageCollection):
+            return
+
+        first = query.results
+        # drop the query, it keeps its raw json for debugging
+        del query
+
+        location = ApiClient._split_href(first.href, self._rootpath)
+        if location is None:
+            # results without usable self link, page over the query resource
+            collection = first
+            offset = 1
+            while True:
+                for wp in collection:
+                    yield wp
+
+                if collection.total < collection.offset * collection.pagesize:
+                    break
+
+                offset += 1
+                result = await self.get(f"queries/{query_id}", payload={'pageSize': page_size, 'offset': offset})
+                if not result or not isinstance(result.results, res.WorkPackageCollection):
+                    break
+                collection = result.results
+            return
+
+        resource, payload = location
+        async for collection in self._iter_pages(resource, payload, page_size, workers, first=first):
+            for wp in collection:
+                yield wp
+
+    async def get_relation(self, relation_id: int) -> res.Relation:
+        return await self.get(f"relations/{relation_id}")
+
+    async def get_relations(self) -> List[res.Relation]:
+        return await self._get_list(f"relations", page_size=500)
+
+    def iter_relations(self, page_size: int = 500) -> AsyncIterator[res.Relation]:
+        return self.iter_paged_collection(f"relations", page_size=page_size)
+
+    async def get_user(self, user_id: int) -> res.User:
+        return await self.get(f"users/{user_id}")
+
+    async def get_users(self) -> List[res.User]:
+        return await self._get_list(f"users")
+
+    async def get_placeholder_users(self) -> List[res.PlaceholderUser]:
+        return await self._get_list(f"placeholder_users")
+
+    async def get_project_member(self, id: int) -> res.Membership:
+        return await self.get(f"memberships/{id}")
+
+    async def get_project_members(self) -> List[res.Membership]:
+        return await self._get_list(f"memberships")
+
+    async def get_status(self, id: int) -> res.Status:
+        return await self.get(f"statuses/{id}")
+
+    async def get_statuses(self) -> List[res.Status]:
+        return await self._get_list(f"statuses")
+
+    async def get_version(self, id: int) -> res.Version:
+        return await self.get(f"versions/{id}")
+
+    async def get_versions(self) -> List[res.Version]:
+        return await self._get_list(f"versions")
+
+    async def get_grid(self, grid_id: int) -> res.Grid:
+        return await self.get(f"grids/{grid_id}")
+
+    async def get_grids(self, scope: str = None) -> List[res.Grid]:
+        # build filter
+        filters = []
+        if scope:
+            filters.append({"scope": {"operator": "=", "values": [scope]}})
+
+        payload = {}
+        if len(filters):
+            payload.update({'filters': json.dumps(filters)})
+
+        return await self.get_paged_collection(f"grids", page_size=100, payload=payload)
+
+    async def get_query(self, query_id: int) -> res.Query:
+        # we do not need any elements in here, use get_workpackages_by_query_id functions
+        return await self.get(f"queries/{query_id}", payload={'pageSize': 0})
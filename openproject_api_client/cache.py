@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CacheEntry(object):
+    def __init__(self, response: requests.Response):
+        self.content = response.content
+        self.headers = dict(response.headers)
+        self.encoding = response.encoding
+        self.url = response.url
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+
+    def __len__(self):
+        return len(self.content)
+
+    def validators(self) -> dict:
+        """
+        headers for a conditional request revalidating this entry
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+    def to_response(self, not_modified: requests.Response) -> requests.Response:
+        """
+        builds a 200 response from the cached body for a 304 response
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = self.content
+        response.headers = CaseInsensitiveDict(self.headers)
+        # a 304 may carry updated validators
+        for header in ('ETag', 'Last-Modified', 'Date'):
+            if header in not_modified.headers:
+                response.headers[header] = not_modified.headers[header]
+        response.encoding = self.encoding
+        response.url = self.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
+
+
+class ResponseCache(object):
+    """
+    in memory cache for GET responses, revalidated by conditional requests
+
+    responses are stored with their ETag / Last-Modified validators, the next request for
+    the same url and parameters is sent with If-None-Match / If-Modified-Since. when the
+    server answers 304 the body is served from memory instead of being transferred again.
+    the cache is bounded by number of entries and by bytes, least recently used entries are
+    evicted first. it is safe to use from multiple threads.
+
+    usage: ApiClient(base_url, apikey, cache=ResponseCache(max_entries=500))
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_entries: max. number of responses kept
+        :param max_bytes: max. sum of body sizes kept
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(endpoint: str, payload: dict = None):
+        return endpoint, tuple(sorted((k, str(v)) for k, v in (payload or {}).items() if v is not None))
+
+    def lookup(self, key) -> CacheEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+    def update(self, key, entry: CacheEntry, response: requests.Response) -> requests.Response:
+        """
+        processes the response of a (conditional) request made for `key`
+
+        :param key: cache key of the request
+        :param entry: entry used to build the conditional request, None if there was none
+        :param response: response from the server
+        :return: response to hand to the caller
+        """
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.hits += 1
+            return entry.to_response(response)
+
+        with self._lock:
+            self.misses += 1
+
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            self._store(key, CacheEntry(response))
+        elif entry is not None:
+            self.invalidate(key)
+
+        return response
+
+    def _store(self, key, entry: CacheEntry):
+        if len(entry) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._entries[key] = entry
+            self._bytes += len(entry)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """
+        removes one entry or, without key, all entries
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._bytes -= len(entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,8 +1,10 @@
 import argparse
+import datetime
 import os
 import json
 
 import openproject_api_client as opc
+from openproject_api_client.compact import as_dict
 
 def main():
     parser = argparse.ArgumentParser(description='openproject api client')
@@ -42,9 +44,17 @@ def main():
         print("error during request: {}".format(err))
 
 
+def _json_default(obj):
+    # datetime is a subclass of date
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+
+    return as_dict(obj)
+
+
 def json_out(data):
     print(json.dumps(data,
-                     default=lambda o: o.__dict__,
+                     default=_json_default,
                      sort_keys=True,
                      indent=2,
                      separators=(',', ': ')))
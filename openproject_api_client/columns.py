@@ -0,0 +1,193 @@
+import datetime
+import math
+from array import array
+from typing import Dict, Iterable
+
+# import types
+import openproject_api_client.resources as res
+from openproject_api_client.graph import parse_duration_hours
+
+
+def _numpy():
+    # imported on first use, loading numpy (and pandas) with the package is slow
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return numpy
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return pandas
+
+
+# value of id columns for workpackages without the linked resource
+MISSING_ID = -1
+
+# id columns taken from the link href, embedded resources take precedence like in WorkPackage
+_ID_COLUMNS = (
+    ('status', 'status_id', False),
+    ('assignee', 'assignee_id', True),
+    ('project', 'project_id', True),
+    ('version', 'version_id', True),
+)
+
+_DATETIME_COLUMNS = (('createdAt', 'createdat'), ('updatedAt', 'updatedat'))
+_DATE_COLUMNS = (('startDate', 'startdate'), ('dueDate', 'duedate'))
+
+
+class WorkPackageColumns(object):
+    """
+    column store of workpackages, built from the raw json of collection pages
+
+    every column is one array (ids, numbers) or list (dates) with one entry per workpackage,
+    so no WorkPackage objects are created. columns are filled page by page while streaming:
+
+        columns = client.get_workpackage_columns(46)
+        df = columns.to_pandas()
+
+    columns:
+        id, status_id, assignee_id, project_id, version_id: array('q'), MISSING_ID if not set
+        createdat, updatedat: list of datetime (UTC offset from the api) or None
+        startdate, duedate: list of datetime (midnight) or None
+        estimatedtime: array('d') in hours, NaN if not set
+        percentagedone: array('d'), NaN if not set
+    """
+
+    COLUMNS = ('id', 'status_id', 'assignee_id', 'project_id', 'version_id', 'createdat', 'updatedat',
+               'startdate', 'duedate', 'estimatedtime', 'percentagedone')
+
+    def __init__(self, elements: Iterable[dict] = None):
+        """
+        :param elements: raw json of workpackages, i.e. Collection.raw_elements()
+        """
+        self.id = array('q')
+        self.status_id = array('q')
+        self.assignee_id = array('q')
+        self.project_id = array('q')
+        self.version_id = array('q')
+        self.createdat = []
+        self.updatedat = []
+        self.startdate = []
+        self.duedate = []
+        self.estimatedtime = array('d')
+        self.percentagedone = array('d')
+
+        if elements is not None:
+            self.extend(elements)
+
+    def __len__(self):
+        return len(self.id)
+
+    def extend(self, elements: Iterable[dict]):
+        for element in elements:
+            self.append(element)
+
+    def append(self, element: dict):
+        """
+        adds the raw json of one workpackage
+        """
+        self.id.append(element.get('id') or MISSING_ID)
+
+        links = element.get('_links') or {}
+        embedded = element.get('_embedded') or {}
+        for name, column, from_embedded in _ID_COLUMNS:
+            value = MISSING_ID
+            link = links.get(name)
+            if link and link.get('href'):
+                try:
+                    value = res._href_id(link['href'])
+                except ValueError:
+                    pass
+            if from_embedded and name in embedded:
+                value = embedded[name].get('id') or MISSING_ID
+            getattr(self, column).append(value)
+
+        for key, column in _DATETIME_COLUMNS:
+            getattr(self, column).append(self._parsed(res._parse_datetime(element.get(key))))
+
+        for key, column in _DATE_COLUMNS:
+            getattr(self, column).append(self._parsed(res._parse_date(element.get(key))))
+
+        hours = parse_duration_hours(element.get('estimatedTime'))
+        self.estimatedtime.append(math.nan if hours is None else hours)
+
+        done = element.get('percentageDone')
+        self.percentagedone.append(math.nan if done is None else float(done))
+
+    @staticmethod
+    def _parsed(value):
+        # unparseable values are returned as string by the parsers, they have no place in a column
+        return value if isinstance(value, datetime.datetime) else None
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        columns by name, the arrays and lists are not copied
+        """
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """
+        columns as numpy arrays by name, timestamps as datetime64[s] in UTC, NaT if not set
+
+        :raises ImportError: if numpy is not installed
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError('to_numpy requires numpy')
+
+        columns = {}
+        for name in self.COLUMNS:
+            values = getattr(self, name)
+            if isinstance(values, array):
+                # copied through the buffer protocol, a shared buffer would block further appends
+                columns[name] = numpy.array(values)
+            else:
+                columns[name] = numpy.array([self._utc(v) for v in values], dtype='datetime64[s]')
+
+        return columns
+
+    def to_pandas(self) -> 'pandas.DataFrame':
+        """
+        columns as DataFrame, id columns as nullable Int64 (NA if not set), timestamps as
+        datetime64 in UTC
+
+        :raises ImportError: if pandas is not installed
+        """
+        pandas = _pandas()
+        if pandas is None:
+            raise ImportError('to_pandas requires pandas')
+
+        columns = self.to_numpy()
+        for name, values in columns.items():
+            if values.dtype == 'int64' and name != 'id':
+                columns[name] = pandas.arrays.IntegerArray(values, values == MISSING_ID)
+            elif name in ('createdat', 'updatedat'):
+                columns[name] = pandas.to_datetime(values).tz_localize('UTC')
+
+        return pandas.DataFrame(columns)
+
+    def table(self):
+        """
+        best available representation: DataFrame if pandas is installed, dict of numpy arrays
+        if numpy is installed, otherwise to_dict()
+        """
+        if _pandas() is not None:
+            return self.to_pandas()
+        if _numpy() is not None:
+            return self.to_numpy()
+
+        return self.to_dict()
+
+    @staticmethod
+    def _utc(value):
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+        return value
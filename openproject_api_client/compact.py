@@ -0,0 +1,155 @@
+from types import MappingProxyType
+
+# import types
+import openproject_api_client.resources as res
+
+# attributes of current api versions which are not initialized by the resource classes,
+# they get a slot as well so the instance dict is not needed for them
+_EXTRA_FIELDS = {
+    res.WorkPackage: ('derivedduedate', 'derivedpercentagedone', 'derivedremainingtime', 'duration',
+                      'ignorenonworkingdays', 'laborcosts', 'materialcosts', 'overallcosts', 'position',
+                      'readonly', 'remainingtime', 'spenttime', 'storypoints'),
+}
+
+# relation containers only kept when a workpackage has relations
+_RELATION_DEFAULTS = {
+    'relations_obj': (),
+    'relations_out': MappingProxyType({}),
+    'relations_in': MappingProxyType({}),
+}
+
+_COMPACT_CLASSES = {}
+
+
+class CompactResource(object):
+    """
+    mixin of the compact resource classes, see compact_class()
+
+    empty relation containers are not stored, reading them returns a shared empty, read only
+    tuple / mapping. update_relations() and RelationIndex.attach() set them as usual.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for name in _RELATION_DEFAULTS:
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            if not value:
+                delattr(self, name)
+
+    def __reduce__(self):
+        # compact classes are created at runtime, pickle them by their resource class
+        return _restore, (self._resource_class, as_dict(self))
+
+    def __getattr__(self, name):
+        # only called if the attribute is not set
+        if name in _RELATION_DEFAULTS:
+            return _RELATION_DEFAULTS[name]
+
+        return super().__getattr__(name)
+
+
+def _prototype_fields(cls) -> tuple:
+    """
+    attributes set by the constructor of a resource class for a minimal json object
+    """
+    try:
+        prototype = cls({'_links': {}})
+    except Exception:
+        return ()
+
+    return tuple(vars(prototype))
+
+
+def compact_class(cls):
+    """
+    returns a subclass of a resource class which keeps the known attributes in __slots__
+
+    the subclass behaves like the resource class (isinstance, methods, attribute names), but
+    does not allocate an instance dict unless an attribute without slot is set. instances
+    are created from decoded objects by to_compact() or directly from json like the
+    resource class.
+    """
+    if issubclass(cls, CompactResource):
+        return cls
+
+    compact = _COMPACT_CLASSES.get(cls)
+    if compact is None:
+        # declared date fields are set from json even if the constructor does not initialize them
+        declared = tuple(f.lower() for f in cls._datetime_fields + cls._date_fields)
+
+        fields = []
+        for field in _prototype_fields(cls) + declared + _EXTRA_FIELDS.get(cls, ()):
+            # attributes of the class itself (i.e. _LINKS) must not be shadowed
+            if field not in fields and not hasattr(cls, field):
+                fields.append(field)
+
+        compact = type('Compact' + cls.__name__, (CompactResource, cls), {
+            '__slots__': tuple(fields),
+            '__module__': __name__,
+            '_resource_class': cls,
+        }, register=False)
+        compact = _COMPACT_CLASSES.setdefault(cls, compact)
+
+    return compact
+
+
+def to_compact(obj):
+    """
+    copies a decoded resource into an instance of its compact class
+
+    objects which are not resources (i.e. SimpleNamespace) are returned unchanged
+    """
+    if not isinstance(obj, res.GenericType) or isinstance(obj, CompactResource):
+        return obj
+
+    cls = compact_class(type(obj))
+    compact = cls.__new__(cls)
+    for k, v in vars(obj).items():
+        if k in _RELATION_DEFAULTS and not v:
+            continue
+        if k == '_raw_dates':
+            # values not parsed yet (lazy_dates), the copy parses them on its own
+            v = dict(v)
+        setattr(compact, k, v)
+
+    return compact
+
+
+def as_dict(obj) -> dict:
+    """
+    attributes of a regular or compact resource as dict, use instead of vars() / __dict__
+
+    other objects with attributes (i.e. SimpleNamespace) return their __dict__, anything
+    else raises TypeError, so it can be used as `default` of json.dumps without silently
+    dropping values
+    """
+    if isinstance(obj, res.GenericType):
+        obj.parse_dates()
+    elif not hasattr(obj, '__dict__'):
+        raise TypeError(f"object of type {type(obj).__name__} has no attributes")
+
+    values = {}
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            try:
+                values[name] = object.__getattribute__(obj, name)
+            except AttributeError:
+                # slot not set
+                pass
+
+    values.update(getattr(obj, '__dict__', {}))
+    return values
+
+
+def _restore(cls, values: dict):
+    compact = compact_class(cls)
+    obj = compact.__new__(compact)
+    for k, v in values.items():
+        setattr(obj, k, v)
+
+    return obj
@@ -0,0 +1,354 @@
+import datetime
+import re
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# import types
+import openproject_api_client.resources as res
+
+# relation types which order workpackages, True if the edge points from `from` to `to`
+SCHEDULING_RELATIONS = {
+    'precedes': True,
+    'follows': False,
+    'blocks': True,
+    'blocked': False,
+}
+
+_DURATION_PATTERN = re.compile(
+    r'^P(?:(?P<weeks>\d+(?:\.\d+)?)W)?(?:(?P<days>\d+(?:\.\d+)?)D)?'
+    r'(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$')
+
+
+class GraphCycleError(Exception):
+    def __init__(self, cycle: List[int]):
+        super().__init__(f"dependency cycle: {' -> '.join(str(i) for i in cycle)}")
+        self.cycle = cycle
+
+
+def parse_duration_hours(value) -> Optional[float]:
+    """
+    converts an ISO 8601 duration like 'PT8H' or 'P1DT4H' (estimatedTime) into hours
+
+    :return: hours or None if the value is empty or not parseable
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    m = _DURATION_PATTERN.match(value)
+    if not m:
+        return None
+
+    parts = {k: float(v) for k, v in m.groupdict().items() if v}
+    return (parts.get('weeks', 0) * 168 + parts.get('days', 0) * 24 + parts.get('hours', 0)
+            + parts.get('minutes', 0) / 60 + parts.get('seconds', 0) / 3600)
+
+
+def _as_date(value) -> Optional[datetime.date]:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+
+    return None
+
+
+def workpackage_duration(wp: res.WorkPackage, hours_per_day: float = 8.0) -> float:
+    """
+    duration of a workpackage in days
+
+    uses startdate/duedate (both inclusive) if set, otherwise estimatedtime converted with
+    `hours_per_day`, otherwise 0
+    """
+    start = _as_date(wp.startdate)
+    due = _as_date(wp.duedate)
+    if start is not None and due is not None:
+        return max((due - start).days + 1, 0)
+
+    hours = parse_duration_hours(wp.estimatedtime)
+    if hours is not None:
+        return hours / hours_per_day
+
+    return 0.0
+
+
+class DependencyGraph(object):
+    """
+    scheduling graph of workpackages built from relations
+
+    an edge u -> v means u has to be finished before v can start (u precedes/blocks v).
+    nodes are mapped to consecutive integers, adjacency is kept in compressed arrays
+    (offsets into one array of targets) in both directions, so large graphs stay compact
+    and traversals do not allocate per node.
+
+    usage:
+        graph = DependencyGraph(client.get_relations(), workpackages=wps)
+        order = graph.topological_order()
+        length, path = graph.critical_path()
+    """
+
+    def __init__(self, relations: Iterable[res.Relation], workpackages: Iterable[res.WorkPackage] = None,
+                 relation_types: Dict[str, bool] = None):
+        """
+        :param relations: relations to build the graph from, other types than relation_types are ignored
+        :param workpackages: workpackages used for durations, they are added as nodes even without relations
+        :param relation_types: relation type -> True if the edge points from `from` to `to`,
+                               defaults to SCHEDULING_RELATIONS
+        """
+        if relation_types is None:
+            relation_types = SCHEDULING_RELATIONS
+
+        self.ids: List[int] = []
+        self._index: Dict[int, int] = {}
+        self.workpackages: Dict[int, res.WorkPackage] = {}
+
+        if isinstance(workpackages, dict):
+            workpackages = workpackages.values()
+
+        for wp in workpackages or []:
+            self.workpackages[wp.id] = wp
+            self._node(wp.id)
+
+        sources = array('l')
+        targets = array('l')
+        lags = array('d')
+        for r in relations:
+            forward = relation_types.get(r.type)
+            if forward is None or r.from_id is None or r.to_id is None:
+                continue
+
+            u = self._node(r.from_id)
+            v = self._node(r.to_id)
+            if not forward:
+                u, v = v, u
+
+            sources.append(u)
+            targets.append(v)
+            lags.append(float(getattr(r, 'lag', None) or getattr(r, 'delay', None) or 0))
+
+        n = len(self.ids)
+        self._out_offsets, self._out_targets, self._out_lags = self._compress(n, sources, targets, lags)
+        self._in_offsets, self._in_targets, self._in_lags = self._compress(n, targets, sources, lags)
+
+    def _node(self, wp_id: int) -> int:
+        i = self._index.get(wp_id)
+        if i is None:
+            i = len(self.ids)
+            self._index[wp_id] = i
+            self.ids.append(wp_id)
+
+        return i
+
+    @staticmethod
+    def _compress(n: int, sources: array, targets: array, lags: array) -> Tuple[array, array, array]:
+        offsets = array('l', [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        position = array('l', offsets)
+        compressed_targets = array('l', [0]) * len(targets)
+        compressed_lags = array('d', [0.0]) * len(targets)
+        for u, v, lag in zip(sources, targets, lags):
+            p = position[u]
+            compressed_targets[p] = v
+            compressed_lags[p] = lag
+            position[u] = p + 1
+
+        return offsets, compressed_targets, compressed_lags
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, wp_id: int):
+        return wp_id in self._index
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._out_targets)
+
+    def successors(self, wp_id: int) -> List[int]:
+        i = self._index[wp_id]
+        return [self.ids[v] for v in self._out_targets[self._out_offsets[i]:self._out_offsets[i + 1]]]
+
+    def predecessors(self, wp_id: int) -> List[int]:
+        i = self._index[wp_id]
+        return [self.ids[v] for v in self._in_targets[self._in_offsets[i]:self._in_offsets[i + 1]]]
+
+    def find_cycle(self) -> Optional[List[int]]:
+        """
+        :return: ids of a cycle (first id repeated at the end) or None if the graph is acyclic
+        """
+        offsets, targets = self._out_offsets, self._out_targets
+        n = len(self.ids)
+        # 0 = unvisited, 1 = on stack, 2 = done
+        state = bytearray(n)
+        parent = array('l', [-1]) * n
+
+        for root in range(n):
+            if state[root]:
+                continue
+
+            state[root] = 1
+            stack = [(root, offsets[root])]
+            while stack:
+                u, p = stack[-1]
+                if p == offsets[u + 1]:
+                    state[u] = 2
+                    stack.pop()
+                    continue
+
+                stack[-1] = (u, p + 1)
+                v = targets[p]
+                if state[v] == 0:
+                    state[v] = 1
+                    parent[v] = u
+                    stack.append((v, offsets[v]))
+                elif state[v] == 1:
+                    cycle = [v]
+                    while u != v:
+                        cycle.append(u)
+                        u = parent[u]
+                    cycle.append(v)
+                    cycle.reverse()
+                    return [self.ids[i] for i in cycle]
+
+        return None
+
+    def has_cycle(self) -> bool:
+        return self.find_cycle() is not None
+
+    def _topological_indices(self) -> array:
+        offsets, targets = self._out_offsets, self._out_targets
+        n = len(self.ids)
+
+        indegree = array('l', [0]) * n
+        for v in targets:
+            indegree[v] += 1
+
+        order = array('l')
+        queue = deque(i for i in range(n) if indegree[i] == 0)
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for p in range(offsets[u], offsets[u + 1]):
+                v = targets[p]
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    queue.append(v)
+
+        if len(order) != n:
+            raise GraphCycleError(self.find_cycle())
+
+        return order
+
+    def topological_order(self) -> List[int]:
+        """
+        ids ordered so that every workpackage comes after all its predecessors
+
+        :raises GraphCycleError: if the graph contains a cycle
+        """
+        return [self.ids[i] for i in self._topological_indices()]
+
+    def _reach(self, start: int, offsets: array, targets: array, stop: int = -1) -> bytearray:
+        seen = bytearray(len(self.ids))
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for p in range(offsets[u], offsets[u + 1]):
+                v = targets[p]
+                if not seen[v]:
+                    seen[v] = 1
+                    if v == stop:
+                        return seen
+                    stack.append(v)
+
+        return seen
+
+    def descendants(self, wp_id: int) -> Set[int]:
+        """
+        ids of all workpackages which (transitively) depend on wp_id
+        """
+        seen = self._reach(self._index[wp_id], self._out_offsets, self._out_targets)
+        return {self.ids[i] for i, s in enumerate(seen) if s}
+
+    def ancestors(self, wp_id: int) -> Set[int]:
+        """
+        ids of all workpackages wp_id (transitively) depends on
+        """
+        seen = self._reach(self._index[wp_id], self._in_offsets, self._in_targets)
+        return {self.ids[i] for i, s in enumerate(seen) if s}
+
+    def is_reachable(self, from_id: int, to_id: int) -> bool:
+        """
+        True if to_id (transitively) depends on from_id
+        """
+        if from_id not in self._index or to_id not in self._index:
+            return False
+
+        target = self._index[to_id]
+        return bool(self._reach(self._index[from_id], self._out_offsets, self._out_targets, stop=target)[target])
+
+    def transitive_closure(self, wp_ids: Iterable[int] = None) -> Dict[int, Set[int]]:
+        """
+        descendants of the given workpackages (default: all), one traversal per workpackage
+
+        the closure of all nodes can be quadratic in size, restrict wp_ids for large graphs
+        """
+        if wp_ids is None:
+            wp_ids = self.ids
+
+        return {wp_id: self.descendants(wp_id) for wp_id in wp_ids}
+
+    def critical_path(self, duration: Callable[[res.WorkPackage], float] = None,
+                      hours_per_day: float = 8.0) -> Tuple[float, List[int]]:
+        """
+        longest chain of dependent workpackages weighted by duration (plus relation lag)
+
+        :param duration: function returning the duration of a workpackage in days,
+                         defaults to workpackage_duration; nodes without workpackage have duration 0
+        :param hours_per_day: used by the default duration for estimatedtime
+        :return: tuple of total duration in days and ids along the path
+        :raises GraphCycleError: if the graph contains a cycle
+        """
+        if duration is None:
+            def duration(wp):
+                return workpackage_duration(wp, hours_per_day)
+
+        n = len(self.ids)
+        if n == 0:
+            return 0.0, []
+
+        weights = array('d', [0.0]) * n
+        for i, wp_id in enumerate(self.ids):
+            wp = self.workpackages.get(wp_id)
+            if wp is not None:
+                weights[i] = duration(wp) or 0.0
+
+        offsets, targets, lags = self._out_offsets, self._out_targets, self._out_lags
+        start = array('d', [0.0]) * n
+        previous = array('l', [-1]) * n
+        for u in self._topological_indices():
+            finish = start[u] + weights[u]
+            for p in range(offsets[u], offsets[u + 1]):
+                v = targets[p]
+                candidate = finish + lags[p]
+                if previous[v] < 0 or candidate > start[v]:
+                    start[v] = candidate
+                    previous[v] = u
+
+        end = max(range(n), key=lambda i: start[i] + weights[i])
+        length = start[end] + weights[end]
+
+        path = [end]
+        while previous[path[-1]] >= 0:
+            path.append(previous[path[-1]])
+        path.reverse()
+
+        return length, [self.ids[i] for i in path]
@@ -0,0 +1,94 @@
+import threading
+from typing import Dict, Iterable, Optional
+
+# import types
+import openproject_api_client.resources as res
+
+# link name -> (id attribute, attribute holding the kind of the linked resource, default kind)
+# the kind is the collection segment of the href, i.e. 'users' for /api/v3/users/5
+LINKS = {
+    'type': ('type_id', None, 'types'),
+    'status': ('status_id', None, 'statuses'),
+    'project': ('project_id', None, 'projects'),
+    'version': ('version_id', None, 'versions'),
+    'author': ('author_id', 'author_type', 'users'),
+    'assignee': ('assignee_id', 'assignee_type', 'users'),
+    'responsible': ('responsible_id', 'responsible_type', 'users'),
+    'principal': ('principal_id', 'principal_type', 'users'),
+    'user': ('user_id', None, 'users'),
+    'from': ('from_id', None, 'work_packages'),
+    'to': ('to_id', None, 'work_packages'),
+}
+
+
+def link_href(resource: res.GenericType, name: str, rootpath: str = 'api/v3') -> Optional[str]:
+    """
+    href of a linked resource, rebuilt from the id (and type) attributes of the resource
+
+    :param name: link name, see LINKS
+    :return: href like '/api/v3/users/5' or None if the link is not set
+    """
+    id_attr, kind_attr, kind = LINKS[name]
+    linked_id = getattr(resource, id_attr, None)
+    if linked_id is None:
+        return None
+
+    if kind_attr is not None:
+        kind = getattr(resource, kind_attr, None) or kind
+
+    return f"/{rootpath}/{kind}/{linked_id}"
+
+
+def link_hrefs(resources: Iterable[res.GenericType], names: Iterable[str] = None,
+               rootpath: str = 'api/v3') -> Dict[str, None]:
+    """
+    distinct hrefs linked by the resources, in order of first occurrence
+
+    :param names: link names to collect, defaults to all names of LINKS
+    """
+    names = tuple(names or LINKS)
+    hrefs = {}
+    for resource in resources:
+        for name in names:
+            href = link_href(resource, name, rootpath)
+            if href is not None:
+                hrefs[href] = None
+
+    return hrefs
+
+
+class IdentityMap(object):
+    """
+    resources keyed by href, so every linked resource is fetched and held once
+
+    the first instance added for an href wins, later ones are replaced by it. it is safe to
+    use from multiple threads.
+    """
+
+    def __init__(self):
+        self._objects: Dict[str, res.GenericType] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, href: str):
+        return href in self._objects
+
+    def get(self, href: str) -> Optional[res.GenericType]:
+        return self._objects.get(href)
+
+    def add(self, href: str, obj: res.GenericType) -> res.GenericType:
+        """
+        :return: the instance kept for the href
+        """
+        with self._lock:
+            return self._objects.setdefault(href, obj)
+
+    def discard(self, href: str):
+        with self._lock:
+            self._objects.pop(href, None)
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
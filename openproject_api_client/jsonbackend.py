@@ -0,0 +1,38 @@
+import json
+from types import SimpleNamespace
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# json parser used for response bodies, orjson if installed (pip install openproject-api-client[fast])
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def json_loads(content):
+    """
+    parses a response body (bytes or str) with the fastest available backend
+
+    orjson rejects some documents the stdlib accepts (i.e. NaN), these are parsed again by
+    the stdlib.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            print(f"*warn* orjson unable to parse response, falling back to json, error was: {e}")
+
+    return json.loads(content)
+
+
+def json_namespace(value):
+    """
+    converts parsed json into SimpleNamespace objects, like json.loads with an object_hook
+    """
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: json_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [json_namespace(v) for v in value]
+
+    return value
@@ -0,0 +1,208 @@
+import bisect
+import re
+import threading
+from collections import Counter
+from typing import Dict, Sequence
+
+# upper bounds of the latency buckets in seconds, like the prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r'(?<=/)\d+(?=/|$)|^\d+(?=/|$)')
+
+
+def endpoint_template(resource: str) -> str:
+    """
+    endpoint with ids replaced, i.e. projects/5/work_packages -> projects/{id}/work_packages
+    """
+    return _ID_SEGMENT.sub('{id}', resource.split('?', 1)[0])
+
+
+class Histogram(object):
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # one count per bucket plus +Inf, not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        (upper bound, count of values <= bound) per bucket, the last bound is inf
+        """
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'), ), self.counts):
+            total += count
+            yield bound, total
+
+    def snapshot(self) -> dict:
+        return {
+            'buckets': {_format_bound(bound): count for bound, count in self.cumulative()},
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class _EndpointMetrics(object):
+    def __init__(self, buckets):
+        self.statuses = Counter()
+        self.latency = Histogram(buckets)
+        self.bytes = 0
+        self.pages = 0
+        self.cache_hits = 0
+
+
+class ClientMetrics(object):
+    """
+    counters of the requests made by a client, per endpoint template and resource type
+
+    records per endpoint (ids replaced by {id}) the requests by status code, a latency
+    histogram, response bytes received, collection pages and responses served by the response
+    cache. a response revalidated by the cache is counted as 304, its cached body not as bytes.
+    per resource type the number of decoded objects and the time spent decoding them.
+    it is safe to use from multiple threads.
+
+    usage:
+        client = ApiClient(base_url, apikey, metrics=ClientMetrics())
+        ...
+        client.metrics.snapshot()
+        client.metrics.to_openmetrics()
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS, prefix: str = 'openproject_client'):
+        """
+        :param buckets: upper bounds of the latency histogram buckets in seconds
+        :param prefix: prefix of the metric names in to_openmetrics()
+        """
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+
+        self._endpoints: Dict[str, _EndpointMetrics] = {}
+        # resource type -> [objects, seconds]
+        self._decode: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, template: str) -> _EndpointMetrics:
+        endpoint = self._endpoints.get(template)
+        if endpoint is None:
+            endpoint = self._endpoints[template] = _EndpointMetrics(self.buckets)
+
+        return endpoint
+
+    def observe_request(self, template: str, status, seconds: float, size: int = 0, from_cache: bool = False):
+        """
+        :param status: status code, or 'error' if no response was received
+        :param size: body bytes received from the server
+        :param from_cache: the body was served by the response cache
+        """
+        with self._lock:
+            endpoint = self._endpoint(template)
+            endpoint.statuses[str(status)] += 1
+            endpoint.latency.observe(seconds)
+            endpoint.bytes += size
+            if from_cache:
+                endpoint.cache_hits += 1
+
+    def observe_page(self, template: str):
+        with self._lock:
+            self._endpoint(template).pages += 1
+
+    def observe_decode(self, type_name: str, seconds: float, objects: int = 1):
+        with self._lock:
+            decode = self._decode.get(type_name)
+            if decode is None:
+                decode = self._decode[type_name] = [0, 0.0]
+            decode[0] += objects
+            decode[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._decode.clear()
+
+    def snapshot(self) -> dict:
+        """
+        all numbers as json serializable dict
+        """
+        with self._lock:
+            return {
+                'endpoints': {
+                    template: {
+                        'requests': sum(endpoint.statuses.values()),
+                        'statuses': dict(endpoint.statuses),
+                        'latency': endpoint.latency.snapshot(),
+                        'bytes': endpoint.bytes,
+                        'pages': endpoint.pages,
+                        'cache_hits': endpoint.cache_hits,
+                    }
+                    for template, endpoint in sorted(self._endpoints.items())
+                },
+                'decode': {
+                    type_name: {'objects': objects, 'seconds': seconds}
+                    for type_name, (objects, seconds) in sorted(self._decode.items())
+                },
+            }
+
+    def to_openmetrics(self) -> str:
+        """
+        all numbers in the OpenMetrics text format (also accepted by prometheus)
+        """
+        p = self.prefix
+        lines = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            lines.append(f'# TYPE {p}_requests counter')
+            lines.append(f'# HELP {p}_requests HTTP GET requests by endpoint and status code.')
+            for template, endpoint in endpoints:
+                for status, count in sorted(endpoint.statuses.items()):
+                    lines.append(f'{p}_requests_total{{endpoint="{_escape(template)}",status="{status}"}} {count}')
+
+            lines.append(f'# TYPE {p}_request_duration_seconds histogram')
+            lines.append(f'# UNIT {p}_request_duration_seconds seconds')
+            lines.append(f'# HELP {p}_request_duration_seconds Latency of HTTP GET requests including retries.')
+            for template, endpoint in endpoints:
+                label = f'endpoint="{_escape(template)}"'
+                for bound, count in endpoint.latency.cumulative():
+                    lines.append(f'{p}_request_duration_seconds_bucket{{{label},le="{_format_bound(bound)}"}} {count}')
+                lines.append(f'{p}_request_duration_seconds_count{{{label}}} {endpoint.latency.count}')
+                lines.append(f'{p}_request_duration_seconds_sum{{{label}}} {endpoint.latency.sum}')
+
+            for name, unit, help_text, attr in (
+                    ('response', 'bytes', 'Size of response bodies received.', 'bytes'),
+                    ('pages', None, 'Collection pages fetched.', 'pages'),
+                    ('cache_hits', None, 'Responses served from the response cache.', 'cache_hits')):
+                metric = f'{p}_{name}_{unit}' if unit else f'{p}_{name}'
+                lines.append(f'# TYPE {metric} counter')
+                if unit:
+                    lines.append(f'# UNIT {metric} {unit}')
+                lines.append(f'# HELP {metric} {help_text}')
+                for template, endpoint in endpoints:
+                    lines.append(f'{metric}_total{{endpoint="{_escape(template)}"}} {getattr(endpoint, attr)}')
+
+            decode = sorted(self._decode.items())
+            lines.append(f'# TYPE {p}_decoded_objects counter')
+            lines.append(f'# HELP {p}_decoded_objects Objects decoded by resource type.')
+            for type_name, (objects, _) in decode:
+                lines.append(f'{p}_decoded_objects_total{{type="{_escape(type_name)}"}} {objects}')
+
+            lines.append(f'# TYPE {p}_decode_seconds counter')
+            lines.append(f'# UNIT {p}_decode_seconds seconds')
+            lines.append(f'# HELP {p}_decode_seconds Time spent decoding by resource type.')
+            for type_name, (_, seconds) in decode:
+                lines.append(f'{p}_decode_seconds_total{{type="{_escape(type_name)}"}} {seconds}')
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
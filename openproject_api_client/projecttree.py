@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, List, Union
+
+# import types
+import openproject_api_client.resources as res
+
+
+class ProjectTree(object):
+    """
+    index over the project hierarchy
+
+    the tree is walked once in preorder, every project gets an interval [enter, exit) of
+    positions in that order. a project is a descendant of another one if its position is
+    inside the interval of the other one, so descendant checks are O(1) and a subtree is a
+    slice of the preorder.
+
+    projects whose parent is not part of the list (i.e. not visible for the api user) are
+    treated as roots, their parent ids are collected in `missing_parents`.
+
+    usage:
+        tree = client.get_project_tree()
+        tree.is_descendant(project_id, 54)
+        for p in tree.subtree(54):
+            print(p.fullname)
+    """
+
+    def __init__(self, projects: Union[Iterable[res.Project], Dict[int, res.Project]]):
+        if isinstance(projects, dict):
+            projects = projects.values()
+
+        self.projects: Dict[int, res.Project] = {}
+        for p in projects:
+            self.projects[p.id] = p
+
+        self.children: Dict[int, List[int]] = {i: [] for i in self.projects}
+        self.roots: List[int] = []
+        self.missing_parents = set()
+
+        for i, p in self.projects.items():
+            if p.parent_id and p.parent_id in self.projects and p.parent_id != i:
+                self.children[p.parent_id].append(i)
+            else:
+                if p.parent_id and p.parent_id != i:
+                    self.missing_parents.add(p.parent_id)
+                self.roots.append(i)
+
+        self.order: List[int] = []
+        self._enter: Dict[int, int] = {}
+        self._exit: Dict[int, int] = {}
+        self._path_ids: Dict[int, List[int]] = {}
+        self._fullnames: Dict[int, str] = {}
+
+        for root in self.roots:
+            self._walk(root)
+
+        # projects not reachable from a root are part of a parent cycle, cut them at any node
+        for i in self.projects:
+            if i not in self._enter:
+                self.roots.append(i)
+                self._walk(i)
+
+    def _walk(self, root: int):
+        self._path_ids[root] = []
+        stack = [(root, False)]
+        while stack:
+            i, done = stack.pop()
+            if done:
+                self._exit[i] = len(self.order)
+                continue
+
+            self._enter[i] = len(self.order)
+            self.order.append(i)
+            stack.append((i, True))
+
+            path_ids = self._path_ids[i] + [i]
+            for child in reversed(self.children[i]):
+                if child not in self._enter:
+                    self._path_ids[child] = path_ids
+                    stack.append((child, False))
+
+    def __len__(self):
+        return len(self.projects)
+
+    def __contains__(self, project_id: int):
+        return project_id in self.projects
+
+    def __getitem__(self, project_id: int) -> res.Project:
+        return self.projects[project_id]
+
+    def is_descendant(self, project_id: int, ancestor_id: int) -> bool:
+        """
+        checks if a project is below another one
+
+        :param project_id: project to check
+        :param ancestor_id: root of the subtree
+        :return: True if project_id is a (direct or indirect) subproject of ancestor_id
+        """
+        if project_id not in self._enter or ancestor_id not in self._enter:
+            return False
+
+        return self._enter[ancestor_id] < self._enter[project_id] < self._exit[ancestor_id]
+
+    def subtree_ids(self, project_id: int, include_self: bool = True) -> List[int]:
+        """
+        ids of a project and all projects below it, in preorder
+        """
+        start = self._enter[project_id]
+        if not include_self:
+            start += 1
+
+        return self.order[start:self._exit[project_id]]
+
+    def subtree(self, project_id: int, include_self: bool = True) -> List[res.Project]:
+        """
+        a project and all projects below it, in preorder
+        """
+        return [self.projects[i] for i in self.subtree_ids(project_id, include_self)]
+
+    def path_ids(self, project_id: int) -> List[int]:
+        """
+        ids of all parents, starting at the root
+        """
+        return list(self._path_ids[project_id])
+
+    def level(self, project_id: int) -> int:
+        return len(self._path_ids[project_id]) + 1
+
+    def fullname(self, project_id: int) -> str:
+        """
+        names of the parents and the project joined by '/'
+        """
+        fullname = self._fullnames.get(project_id)
+        if fullname is None:
+            path_ids = self._path_ids[project_id]
+            if path_ids:
+                fullname = self.fullname(path_ids[-1]) + '/' + self.projects[project_id].name
+            else:
+                fullname = self.projects[project_id].name
+            self._fullnames[project_id] = fullname
+
+        return fullname
+
+    def apply(self):
+        """
+        fills path, path_ids, level and fullname of all projects
+        """
+        # preorder visits parents first, so fullname never recurses deeper than one level
+        for i in self.order:
+            p = self.projects[i]
+            p.path_ids = self.path_ids(i)
+            p.path = [self.projects[parent].name for parent in p.path_ids]
+            p.level = len(p.path_ids) + 1
+            p.fullname = self.fullname(i)
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Callable, Dict
+
+# kinds of reference data kept by ReferenceCache, see ApiClient.preload_reference_data()
+REFERENCE_KINDS = ('statuses', 'users', 'placeholder_users', 'versions', 'projects')
+
+
+class ReferenceCache(object):
+    """
+    keeps rarely changing reference data (statuses, users, versions, projects) for a while
+
+    every kind is loaded as a whole and served from memory until its ttl has passed, then it
+    is loaded again on the next access. concurrent accesses of a stale kind load it once.
+    the cached objects are shared between callers and must not be modified.
+
+    usage: ApiClient(base_url, apikey, reference_cache=ReferenceCache(ttl=600, ttls={'users': 60}))
+    """
+
+    def __init__(self, ttl: float = 300, ttls: Dict[str, float] = None):
+        """
+        :param ttl: seconds a kind is served from memory, None to keep it until invalidated
+        :param ttls: ttl per kind (see REFERENCE_KINDS), overrides ttl
+        """
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+
+        # kind -> (time loaded, value)
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+
+    def ttl_of(self, kind: str) -> float:
+        return self.ttls.get(kind, self.ttl)
+
+    def is_fresh(self, kind: str) -> bool:
+        entry = self._entries.get(kind)
+        return entry is not None and self._fresh(kind, entry)
+
+    def _fresh(self, kind: str, entry) -> bool:
+        ttl = self.ttl_of(kind)
+        return ttl is None or time.monotonic() - entry[0] < ttl
+
+    def get(self, kind: str, load: Callable[[], object]):
+        """
+        the cached value of a kind, calls `load` if there is none or it is stale
+
+        :param load: loads the value, returns None if loading failed. nothing is cached then,
+            the next access loads again
+        """
+        entry = self._entries.get(kind)
+        if entry is not None and self._fresh(kind, entry):
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            lock = self._locks.setdefault(kind, threading.Lock())
+
+        with lock:
+            # another thread may have loaded it meanwhile
+            entry = self._entries.get(kind)
+            if entry is not None and self._fresh(kind, entry):
+                return entry[1]
+
+            value = load()
+            if value is None:
+                return None
+
+            with self._lock:
+                self._entries[kind] = (time.monotonic(), value)
+                self.loads += 1
+            return value
+
+    def invalidate(self, kind: str = None):
+        """
+        drops one kind or, without kind, everything
+        """
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(kind, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'kinds': sorted(self._entries),
+                'hits': self.hits,
+                'loads': self.loads,
+            }
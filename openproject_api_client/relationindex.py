@@ -0,0 +1,88 @@
+from typing import Dict, Iterable, List
+
+# import types
+import openproject_api_client.resources as res
+from openproject_api_client import tracing
+
+
+class RelationIndex(object):
+    """
+    index of relations by workpackage id, built once from all relations
+
+    attaching relations to workpackages with WorkPackage.update_relations(relations) filters
+    the whole list for every workpackage. the index is built in one pass and answers the
+    relations of a workpackage by lookup.
+
+    usage:
+        index = RelationIndex(client.get_relations())
+        index.attach(client.get_workpackages_by_project_id(46))
+    """
+
+    def __init__(self, relations: Iterable[res.Relation] = None):
+        self.relations: List[res.Relation] = []
+
+        self._by_workpackage: Dict[int, List[res.Relation]] = {}
+        # workpackage id -> relation type -> ids of related workpackages
+        self._out: Dict[int, Dict[str, List[int]]] = {}
+        self._in: Dict[int, Dict[str, List[int]]] = {}
+
+        for r in relations or []:
+            self.add(r)
+
+    def add(self, r: res.Relation):
+        self.relations.append(r)
+
+        self._by_workpackage.setdefault(r.from_id, []).append(r)
+        if r.to_id != r.from_id:
+            self._by_workpackage.setdefault(r.to_id, []).append(r)
+
+        # outbound relation of from, inbound relation of to
+        self._out.setdefault(r.from_id, {}).setdefault(r.type, []).append(r.to_id)
+        self._in.setdefault(r.to_id, {}).setdefault(r.reversetype, []).append(r.from_id)
+
+    def __len__(self):
+        return len(self.relations)
+
+    def relations_of(self, workpackage_id: int) -> List[res.Relation]:
+        """
+        all relations starting or ending at a workpackage
+        """
+        return list(self._by_workpackage.get(workpackage_id, ()))
+
+    def outgoing(self, workpackage_id: int, relation_type: str = None) -> Dict[str, List[int]]:
+        """
+        ids of workpackages related by outbound relations, by relation type
+
+        :param relation_type: only return relations of this type
+        """
+        out = self._out.get(workpackage_id, {})
+        if relation_type is not None:
+            return {relation_type: list(out[relation_type])} if relation_type in out else {}
+
+        return {t: list(ids) for t, ids in out.items()}
+
+    def incoming(self, workpackage_id: int, relation_type: str = None) -> Dict[str, List[int]]:
+        """
+        ids of workpackages related by inbound relations, by reverse relation type
+
+        :param relation_type: only return relations of this (reverse) type
+        """
+        inbound = self._in.get(workpackage_id, {})
+        if relation_type is not None:
+            return {relation_type: list(inbound[relation_type])} if relation_type in inbound else {}
+
+        return {t: list(ids) for t, ids in inbound.items()}
+
+    def attach(self, workpackages: Iterable[res.WorkPackage]):
+        """
+        sets relations_obj, relations_out and relations_in of all workpackages, same result
+        as calling update_relations(all_relations) on each of them
+        """
+        with tracing.span('relation_index.attach') as span:
+            count = 0
+            for wp in workpackages:
+                wp.relations_obj = self.relations_of(wp.id)
+                wp.relations_out = self.outgoing(wp.id)
+                wp.relations_in = self.incoming(wp.id)
+                count += 1
+            span.set(workpackages=count)
@@ -1,21 +1,169 @@
+import contextlib
+import contextvars
 import datetime
+import functools
+import re
+import threading
 
 from typing import List
 
 from openproject_api_client import apiclient
+from openproject_api_client import tracing
+
+# resource classes by api `_type`, filled when a class is defined, see GenericType.__init_subclass__
+TYPE_REGISTRY = {}
+
+# kinds of json fields, see _FieldPlan
+_PLAIN = 1
+_DATETIME = 2
+_DATE = 3
+
+
+class _FieldPlan(dict):
+    """
+    maps json keys to (attribute name, kind) for one resource class, None if the key is
+    skipped. keys are compiled on first use, so lowercasing and field lookups are done once
+    per key and class instead of once per object.
+    """
+
+    def __init__(self, datetime_fields, date_fields, debug):
+        super().__init__()
+        self.datetime_fields = frozenset(datetime_fields)
+        self.date_fields = frozenset(date_fields)
+        self.debug = debug
+
+    def __missing__(self, key):
+        if not self.debug and key.startswith('_'):
+            step = None
+        else:
+            attr = key.lower()
+            if attr in self.datetime_fields:
+                step = (attr, _DATETIME)
+            elif attr in self.date_fields:
+                step = (attr, _DATE)
+            else:
+                step = (attr, _PLAIN)
+
+        self[key] = step
+        return step
+
+
+_FIELD_PLANS = {}
+
+# canonical api timestamps, anything else is left to strptime
+_DATETIME_PATTERN = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:(Z)|([+-])(\d\d):?([0-5]\d))',
+                               re.ASCII)
+_DATE_PATTERN = re.compile(r'(\d{4})-(\d\d)-(\d\d)', re.ASCII)
+
+# many objects share timestamps and dates, parsed values are kept for the most recent strings
+_PARSE_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_datetime_str(val: str):
+    m = _DATETIME_PATTERN.fullmatch(val)
+    if m is not None:
+        year, month, day, hour, minute, second, utc, sign, tz_hours, tz_minutes = m.groups()
+        try:
+            if utc:
+                tz = datetime.timezone.utc
+            else:
+                offset = datetime.timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+                tz = datetime.timezone(-offset if sign == '-' else offset)
+            return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                                     tzinfo=tz)
+        except ValueError:
+            pass
+
+    try:
+        return datetime.datetime.strptime(val, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return val
+
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_date_str(val: str):
+    m = _DATE_PATTERN.fullmatch(val)
+    if m is not None:
+        try:
+            return datetime.datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            pass
+
+    try:
+        return datetime.datetime.strptime(val, "%Y-%m-%d")
+    except ValueError:
+        return val
+
+
+def _parse_datetime(val):
+    """
+    parses an api timestamp like strptime with "%Y-%m-%dT%H:%M:%S%z", returns the value
+    unchanged if it is empty or not parseable
+    """
+    if not val:
+        return val
+    if isinstance(val, str):
+        return _parse_datetime_str(val)
+
+    return datetime.datetime.strptime(val, "%Y-%m-%dT%H:%M:%S%z")
+
+
+def _parse_date(val):
+    """
+    parses an api date like strptime with "%Y-%m-%d", returns the value unchanged if it is
+    empty or not parseable
+    """
+    if not val:
+        return val
+    if isinstance(val, str):
+        return _parse_date_str(val)
+
+    return datetime.datetime.strptime(val, "%Y-%m-%d")
+
+
+# set while decoding for a client with lazy_dates, see lazy_dates()
+_LAZY_DATES = contextvars.ContextVar('lazy_dates', default=False)
+
+
+@contextlib.contextmanager
+def lazy_dates(enabled: bool = True):
+    """
+    resources decoded in this context keep timestamps and dates as strings and parse them on
+    first attribute access, used by ApiClient(lazy_dates=True)
+    """
+    token = _LAZY_DATES.set(enabled)
+    try:
+        yield
+    finally:
+        _LAZY_DATES.reset(token)
+
+
+def _split_href(href: str) -> List[str]:
+    """
+    splits the last two segments of an href, i.e. /api/v3/users/5 -> ['/api/v3', 'users', '5']
+    """
+    return href.rsplit('/', 2)
+
+
+def _href_id(href: str) -> int:
+    return int(href.rsplit('/', 1)[-1])
 
 
 class GenericType:
+    # json fields parsed as datetime / date, matched against the lowercased json key
+    _datetime_fields = ()
+    _date_fields = ()
+
+    def __init_subclass__(cls, register=True, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if register:
+            register_type(cls)
+
     def __init__(self, json_object=None, datetime_fields=None, date_fields=None, debug=False):
         self.id = None
         self.__type = None
 
-        if datetime_fields is None:
-            datetime_fields = []
-
-        if date_fields is None:
-            date_fields = []
-
         # if we get an obj form decode, fill attribs
         if json_object:
 
@@ -23,47 +171,112 @@ class GenericType:
                 # attach json for debugging
                 self.json = json_object
 
-            for k in json_object.keys():
+            plan = self._field_plan(datetime_fields, date_fields, debug)
+            raw_dates = {} if _LAZY_DATES.get() else None
+            for k, v in json_object.items():
                 if k == '_type':
-                    self.__type = json_object[k]
-
-                if debug or (not k.startswith('_')):
-                    if k.lower() in datetime_fields:
-                        setattr(self, k.lower(), self.__parse_datetime(json_object[k]))
-                    elif k.lower() in date_fields:
-                        setattr(self, k.lower(), self.__parse_date(json_object[k]))
+                    self.__type = v
+
+                step = plan[k]
+                if step is not None:
+                    attr, kind = step
+                    if kind == _PLAIN:
+                        setattr(self, attr, v)
+                    elif raw_dates is not None and v:
+                        raw_dates[attr] = (v, kind)
+                    elif kind == _DATETIME:
+                        setattr(self, attr, _parse_datetime(v))
                     else:
-                        setattr(self, k.lower(), json_object[k])
+                        setattr(self, attr, _parse_date(v))
 
-    def __str__(self):
-        return f"GenericType({self.id}): type: {self.__type}"
+            if raw_dates:
+                self.__defer(raw_dates)
 
-    @staticmethod
-    def __parse_datetime(val):
-        if val:
+    def __defer(self, raw_dates):
+        # the attributes must be unset for __getattr__, constructors initialize them with None
+        for attr in raw_dates:
             try:
-                dt = datetime.datetime.strptime(val, "%Y-%m-%dT%H:%M:%S%z")
-            except ValueError:
-                dt = val
+                delattr(self, attr)
+            except AttributeError:
+                pass
+
+        self._raw_dates = raw_dates
+
+    def __getattr__(self, name):
+        # only called if the attribute is not set, parses values kept raw by lazy_dates()
+        raw_dates = self.__dict__.get('_raw_dates')
+        # one lookup, another thread may pop the entry at any time
+        entry = raw_dates.get(name) if raw_dates else None
+        if entry is not None:
+            value, kind = entry
+            value = _parse_datetime(value) if kind == _DATETIME else _parse_date(value)
+            # set before the entry is popped, so other threads find one or the other
+            setattr(self, name, value)
+            raw_dates.pop(name, None)
+            if not raw_dates:
+                self.__dict__.pop('_raw_dates', None)
+            return value
+
+        try:
+            # parsed by another thread since the regular lookup failed
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            pass
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def parse_dates(self):
+        """
+        parses all values kept raw by lazy_dates(), i.e. before using vars() on the object
+        """
+        for name in list(self.__dict__.get('_raw_dates', ())):
+            getattr(self, name)
+
+    def __getstate__(self):
+        # copies get their own unparsed values, parsing pops them from the dict
+        state = self.__dict__.copy()
+        raw_dates = state.get('_raw_dates')
+        if raw_dates is not None:
+            state['_raw_dates'] = dict(raw_dates)
+        return state
+
+    def _field_plan(self, datetime_fields, date_fields, debug) -> _FieldPlan:
+        if datetime_fields is None and date_fields is None:
+            # fields declared by the class
+            key = (type(self), debug)
+            datetime_fields = self._datetime_fields
+            date_fields = self._date_fields
         else:
-            dt = val
+            datetime_fields = datetime_fields or ()
+            date_fields = date_fields or ()
+            key = (tuple(datetime_fields), tuple(date_fields), debug)
 
-        return dt
+        plan = _FIELD_PLANS.get(key)
+        if plan is None:
+            plan = _FIELD_PLANS.setdefault(key, _FieldPlan(datetime_fields, date_fields, debug))
 
-    @staticmethod
-    def __parse_date(val):
-        if val:
-            try:
-                dt = datetime.datetime.strptime(val, "%Y-%m-%d")
-            except ValueError:
-                dt = val
-        else:
-            dt = val
+        return plan
+
+    def __str__(self):
+        return f"GenericType({self.id}): type: {self.__type}"
+
+
+def register_type(cls, type_name: str = None):
+    """
+    registers a resource class for an api `_type`, defaults to the class name. subclasses
+    of GenericType are registered automatically, a later class replaces an earlier one.
+    """
+    TYPE_REGISTRY[type_name or cls.__name__] = cls
+    return cls
 
-        return dt
+
+register_type(GenericType)
 
 
 class Project(GenericType):
+    # json keys are matched lowercased, so these never match and timestamps stay strings
+    _datetime_fields = ('createdAt', 'updatedAt')
+
     def __init__(self, json_object=None):
         self.id = 0
         self.identifier = ''
@@ -82,7 +295,7 @@ class Project(GenericType):
         self.level = 1
         self.fullname = ''
 
-        super().__init__(json_object, datetime_fields=['createdAt', 'updatedAt'])
+        super().__init__(json_object)
 
         # check for parentId
         if '_embedded' in json_object:
@@ -91,10 +304,11 @@ class Project(GenericType):
 
         if '_links' in json_object:
             if 'parent' in json_object['_links']:
-                if json_object['_links']['parent']['href']:
-                    if json_object['_links']['parent']['href'] != "urn:openproject-org:api:v3:undisclosed":
+                href = json_object['_links']['parent']['href']
+                if href:
+                    if href != "urn:openproject-org:api:v3:undisclosed":
                         try:
-                            self.parent_id = int(json_object['_links']['parent']['href'].split("/")[-1])
+                            self.parent_id = _href_id(href)
                         except:
                             # ok if unparseable
                             pass
@@ -104,6 +318,20 @@ class Project(GenericType):
 
 
 class WorkPackage(GenericType):
+    _datetime_fields = ('createdat', 'updatedat', 'startdate', 'duedate')
+
+    # links setting <name> from title, the id and the type of the linked resource from href
+    _LINKS = (
+        ('type', 'type_id', None),
+        ('priority', None, None),
+        ('status', 'status_id', None),
+        ('project', 'project_id', None),
+        ('author', 'author_id', 'author_type'),
+        ('assignee', 'assignee_id', 'assignee_type'),
+        ('responsible', 'responsible_id', 'responsible_type'),
+        ('version', 'version_id', None),
+    )
+
     def __init__(self, json_object=None):
 
         self.createdat = None
@@ -149,54 +377,25 @@ class WorkPackage(GenericType):
         self.relations_out = {}
         self.relations_in = {}
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat', 'startdate', 'duedate'])
+        super().__init__(json_object, debug=False)
 
         if '_links' in json_object:
-            if 'parent' in json_object['_links']:
-                if json_object['_links']['parent']['href']:
-                    self.parent_id = int(json_object['_links']['parent']['href'].split("/")[-1])
-
-            if 'type' in json_object['_links']:
-                if json_object['_links']['type']['href']:
-                    self.type = json_object['_links']['type']['title']
-                    self.type_id = int(json_object['_links']['type']['href'].split("/")[-1])
-
-            if 'priority' in json_object['_links']:
-                if json_object['_links']['priority']['href']:
-                    self.priority = json_object['_links']['priority']['title']
-
-            if 'status' in json_object['_links']:
-                if json_object['_links']['status']['href']:
-                    self.status = json_object['_links']['status']['title']
-                    self.status_id = int(json_object['_links']['status']['href'].split("/")[-1])
-
-            if 'project' in json_object['_links']:
-                if json_object['_links']['project']['href']:
-                    self.project = json_object['_links']['project']['title']
-                    self.project_id = int(json_object['_links']['project']['href'].split("/")[-1])
-
-            if 'author' in json_object['_links']:
-                if json_object['_links']['author']['href']:
-                    self.author = json_object['_links']['author']['title']
-                    self.author_id = int(json_object['_links']['author']['href'].split("/")[-1])
-                    self.author_type = json_object['_links']['author']['href'].split("/")[-2]
-
-            if 'assignee' in json_object['_links']:
-                if json_object['_links']['assignee']['href']:
-                    self.assignee = json_object['_links']['assignee']['title']
-                    self.assignee_id = int(json_object['_links']['assignee']['href'].split("/")[-1])
-                    self.assignee_type = json_object['_links']['assignee']['href'].split("/")[-2]
-
-            if 'responsible' in json_object['_links']:
-                if json_object['_links']['responsible']['href']:
-                    self.responsible = json_object['_links']['responsible']['title']
-                    self.responsible_id = int(json_object['_links']['responsible']['href'].split("/")[-1])
-                    self.responsible_type = json_object['_links']['responsible']['href'].split("/")[-2]
-
-            if 'version' in json_object['_links']:
-                if json_object['_links']['version']['href']:
-                    self.version = json_object['_links']['version']['title']
-                    self.version_id = int(json_object['_links']['version']['href'].split("/")[-1])
+            links = json_object['_links']
+            if 'parent' in links:
+                if links['parent']['href']:
+                    self.parent_id = _href_id(links['parent']['href'])
+
+            for name, id_attr, type_attr in self._LINKS:
+                if name in links:
+                    link = links[name]
+                    href = link['href']
+                    if href:
+                        setattr(self, name, link['title'])
+                        if id_attr is not None:
+                            segments = _split_href(href)
+                            setattr(self, id_attr, int(segments[-1]))
+                            if type_attr is not None:
+                                setattr(self, type_attr, segments[-2])
 
         if '_embedded' in json_object:
             if 'type' in json_object['_embedded']:
@@ -256,7 +455,7 @@ class WorkPackage(GenericType):
             # inbound relation
             if r.to_id == self.id:
                 # create if node of type does not exists
-                if r.type not in self.relations_in:
+                if r.reversetype not in self.relations_in:
                     self.relations_in[r.reversetype] = []
 
                 self.relations_in[r.reversetype].append(r.from_id)
@@ -271,16 +470,24 @@ class WorkPackage(GenericType):
         by project. fetching that way will NOT include relation information so
         you have to use this function to add relation information when needed
 
+        when attaching relations to many workpackages, pass a RelationIndex instead of
+        the list or use RelationIndex.attach(), filtering the list for every workpackage
+        is O(relations) per call.
+
         :param relations: all relations objects, method filters by itself
-        :type relations: List[Relation]
+        :type relations: List[Relation] or RelationIndex
         """
         if relations is None:
             relations = []
 
-        if relations:
-            self.relations_obj = [r for r in relations if r.to_id == self.id or r.from_id == self.id]
+        with tracing.span('update_relations', id=self.id):
+            if hasattr(relations, 'relations_of'):
+                # RelationIndex, no need to filter
+                self.relations_obj = relations.relations_of(self.id)
+            elif relations:
+                self.relations_obj = [r for r in relations if r.to_id == self.id or r.from_id == self.id]
 
-        self._calculate_relations_inout()
+            self._calculate_relations_inout()
 
 
 class Relation(GenericType):
@@ -298,21 +505,25 @@ class Relation(GenericType):
         super().__init__(json_object, debug=False)
 
         if '_links' in json_object:
-            if 'from' in json_object['_links']:
-                if json_object['_links']['from']['href']:
-                    self.from_id = int(json_object['_links']['from']['href'].split("/")[-1])
-                    self.from_title = json_object['_links']['from']['title']
+            links = json_object['_links']
+            if 'from' in links:
+                if links['from']['href']:
+                    self.from_id = _href_id(links['from']['href'])
+                    self.from_title = links['from']['title']
 
-            if 'to' in json_object['_links']:
-                if json_object['_links']['to']['href']:
-                    self.to_id = int(json_object['_links']['to']['href'].split("/")[-1])
-                    self.to_title = json_object['_links']['to']['title']
+            if 'to' in links:
+                if links['to']['href']:
+                    self.to_id = _href_id(links['to']['href'])
+                    self.to_title = links['to']['title']
 
     def __str__(self):
         return f"Relation({self.id}): {self.from_id} -[{self.type}]-> {self.to_id}"
 
 
 class Version(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+    _date_fields = ('enddate', 'startdate')
+
     def __init__(self, json_object=None):
         self.id = None
         self.createdat = None
@@ -324,8 +535,7 @@ class Version(GenericType):
         self.status = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=['enddate', 'startdate'])
+        super().__init__(json_object, debug=False)
 
         # if '_links' in json_object:
         #     if 'from' in json_object['_links']:
@@ -342,6 +552,9 @@ class Version(GenericType):
         return f"Version({self.id}): {self.name}"
 
 class User(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+    _date_fields = ('enddate', 'startdate')
+
     def __init__(self, json_object=None):
         self.id = None
         self.login = None
@@ -352,8 +565,7 @@ class User(GenericType):
         self.createdAt = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=['enddate', 'startdate'])
+        super().__init__(json_object, debug=False)
 
         # if '_links' in json_object:
         #     if 'from' in json_object['_links']:
@@ -370,19 +582,56 @@ class User(GenericType):
         return f"User({self.id}): {self.name}"
 
 class PlaceholderUser(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __init__(self, json_object=None):
         self.id = None
         self.name = None
         self.createdAt = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=[])
+        super().__init__(json_object, debug=False)
 
     def __str__(self):
         return f"PlaceholderUser({self.id}): {self.name}"
 
+
+class Group(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
+    def __init__(self, json_object=None):
+        self.id = None
+        self.name = None
+        self.createdat = None
+        self.updatedat = None
+
+        super().__init__(json_object, debug=False)
+
+    def __str__(self):
+        return f"Group({self.id}): {self.name}"
+
+
+class Type(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
+    def __init__(self, json_object=None):
+        self.id = None
+        self.name = None
+        self.color = None
+        self.position = None
+        self.isdefault = None
+        self.ismilestone = None
+        self.createdat = None
+        self.updatedat = None
+
+        super().__init__(json_object, debug=False)
+
+    def __str__(self):
+        return f"Type({self.id}): {self.name}"
+
 class Membership(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __init__(self, json_object=None):
         self.id = None
 
@@ -396,25 +645,28 @@ class Membership(GenericType):
         self.createdAt = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=[])
+        super().__init__(json_object, debug=False)
 
-        if 'project' in json_object['_links']:
-            if json_object['_links']['project']['href']:
-                self.project = json_object['_links']['project']['title']
-                self.project_id = int(json_object['_links']['project']['href'].split("/")[-1])
+        links = json_object['_links']
+        if 'project' in links:
+            if links['project']['href']:
+                self.project = links['project']['title']
+                self.project_id = _href_id(links['project']['href'])
 
-        if 'principal' in json_object['_links']:
-            if json_object['_links']['principal']['href']:
-                self.principal = json_object['_links']['principal']['title']
-                self.principal_id = int(json_object['_links']['principal']['href'].split("/")[-1])
-                self.principal_type = json_object['_links']['principal']['href'].split("/")[-2]
+        if 'principal' in links:
+            if links['principal']['href']:
+                self.principal = links['principal']['title']
+                segments = _split_href(links['principal']['href'])
+                self.principal_id = int(segments[-1])
+                self.principal_type = segments[-2]
 
 
     def __str__(self):
         return f"Membership({self.id}): {self.name}"
 
 class Status(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __init__(self, json_object=None):
         self.id = None
 
@@ -426,12 +678,13 @@ class Status(GenericType):
         self.createdAt = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=[])
+        super().__init__(json_object, debug=False)
     def __str__(self):
         return f"Status({self.id}): {self.name}"
 
 class Version(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __init__(self, json_object=None):
         self.id = None
 
@@ -443,12 +696,13 @@ class Version(GenericType):
         self.createdAt = None
         self.updatedat = None
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'],
-                         date_fields=[])
+        super().__init__(json_object, debug=False)
     def __str__(self):
         return f"Version({self.id}): {self.name}"
 
 class Grid(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __init__(self, json_object=None):
         self.id = None
         self.columncount = None
@@ -461,7 +715,7 @@ class Grid(GenericType):
 
         self.scope = ''
 
-        super().__init__(json_object, debug=False, datetime_fields=['createdat', 'updatedat'])
+        super().__init__(json_object, debug=False)
 
         if '_links' in json_object:
             if 'scope' in json_object['_links']:
@@ -500,6 +754,8 @@ class GridWidget(GenericType):
 
 
 class Query(GenericType):
+    _datetime_fields = ('createdat', 'updatedat')
+
     def __str__(self):
         return f"Query({self.id}): {self.name}"
 
@@ -526,17 +782,18 @@ class Query(GenericType):
 
         self.results = None
 
-        super().__init__(json_object, debug=True, datetime_fields=['createdat', 'updatedat'])
+        super().__init__(json_object, debug=True)
 
-        if 'project' in json_object['_links']:
-            if json_object['_links']['project']['href']:
-                self.project = json_object['_links']['project']['title']
-                self.project_id = int(json_object['_links']['project']['href'].split("/")[-1])
+        links = json_object['_links']
+        if 'project' in links:
+            if links['project']['href']:
+                self.project = links['project']['title']
+                self.project_id = _href_id(links['project']['href'])
 
-        if 'user' in json_object['_links']:
-            if json_object['_links']['user']['href']:
-                self.user = json_object['_links']['user']['title']
-                self.user_id = int(json_object['_links']['user']['href'].split("/")[-1])
+        if 'user' in links:
+            if links['user']['href']:
+                self.user = links['user']['title']
+                self.user_id = _href_id(links['user']['href'])
 
         if '_embedded' in json_object:
             if 'results' in json_object['_embedded']:
@@ -547,32 +804,105 @@ class Query(GenericType):
 
 
 class Collection(GenericType):
+    """
+    a page of a collection
+
+    elements are kept as json and decoded on first access (iteration or index), so reading
+    only total, ids() or the first elements does not decode the whole page. elements
+    without type info are returned as json. a collection can be shared between threads
+    (i.e. by SingleFlight), every element is decoded once and all readers get the same object.
+    """
     # https://thispointer.com/python-how-to-make-a-class-iterable-create-iterator-class-for-it/
 
     def __init__(self, json_object=None):
-        self._items = None
+        self._elements = []
+        self._items = []
+        self._decode_lock = threading.Lock()
+        # elements are decoded later, like the collection itself
+        self._lazy_dates = _LAZY_DATES.get()
         self.count = None
         self.offset = None
         self.pagesize = None
         self.total = None
+        self.href = None
+
+        if '_links' in json_object:
+            if 'self' in json_object['_links']:
+                self.href = json_object['_links']['self'].get('href')
 
         if '_embedded' in json_object:
             if 'elements' in json_object['_embedded']:
-                elements = json_object['_embedded']['elements']
+                self._elements = json_object['_embedded']['elements']
+                # decoded elements, None until first access
+                self._items = [None] * len(self._elements)
 
-                try:
-                    items = []
-                    for element in elements:
-                        items.append(apiclient.ApiClient.decode(element))
-                    self._items = items
+        super().__init__(json_object)
+
+    def _item(self, index: int):
+        item = self._items[index]
+        if item is not None:
+            return item
 
+        with self._decode_lock:
+            # another thread may have decoded it meanwhile
+            item = self._items[index]
+            if item is None:
+                element = self._elements[index]
+                try:
+                    if self._lazy_dates and not _LAZY_DATES.get():
+                        with lazy_dates():
+                            item = apiclient.ApiClient.decode(element)
+                    else:
+                        item = apiclient.ApiClient.decode(element)
                 except apiclient.ApiError:
-                    self._items = elements
+                    item = element
+                self._items[index] = item
 
-        super().__init__(json_object)
+        return item
+
+    def __getstate__(self):
+        # locks can not be pickled or copied, copies get their own
+        state = super().__getstate__()
+        del state['_decode_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._decode_lock = threading.Lock()
 
     def __iter__(self):
-        return iter(self._items)
+        for index in range(len(self._elements)):
+            yield self._item(index)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __bool__(self):
+        # a collection is truthy even if the page is empty, like before __len__ was defined
+        return True
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self._elements)))]
+
+        if index < 0:
+            index += len(self._elements)
+        if not 0 <= index < len(self._elements):
+            raise IndexError('collection index out of range')
+
+        return self._item(index)
+
+    def ids(self) -> List[int]:
+        """
+        ids of the elements on this page, without decoding them
+        """
+        return [element.get('id') for element in self._elements]
+
+    def raw_elements(self) -> List[dict]:
+        """
+        json of the elements on this page
+        """
+        return self._elements
 
     def __str__(self):
         return f"{self.__class__.__name__}: count={self.count} total={self.total}"
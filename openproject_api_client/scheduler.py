@@ -0,0 +1,221 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+# responses telling the client to slow down, GETs answered with them are retried
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# errors of an overloaded server or network, GETs failing with them are retried.
+# ChunkedEncodingError is a connection reset while reading the body
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# growth near the limit of the last overload is this many times slower
+_PROBE_SLOWDOWN = 8
+
+
+class RequestScheduler(object):
+    """
+    limits the number of requests in flight and adapts the limit to the server (AIMD)
+
+    every successful request raises the limit by 1 / limit, so it grows by about one per round
+    of requests (additive increase), slower when it gets close to the limit of the last
+    overload. a throttling response (429, 503, ...), a connection error (also a reset while
+    reading the body), a timeout or a response much slower than usual cuts the limit by `decrease` (multiplicative decrease), at
+    most once per round: only requests started after the last cut can cut again.
+
+    GETs are idempotent, so failed ones are retried up to max_retries times. a Retry-After
+    header pauses all requests for the given time, otherwise the retry waits a random time up
+    to backoff * 2 ** attempt (full jitter).
+
+    the scheduler can be shared by clients talking to the same server and between threads.
+
+    usage: ApiClient(base_url, apikey, workers=8, scheduler=RequestScheduler(max_limit=8))
+    """
+
+    def __init__(self, initial_limit: float = 2, min_limit: float = 1, max_limit: float = 64,
+                 decrease: float = 0.5, latency_target: float = None, latency_tolerance: float = 3.0,
+                 max_retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 timeout: float = 60.0, retry_statuses=RETRY_STATUSES):
+        """
+        :param initial_limit: concurrency limit at start
+        :param min_limit: lower bound of the limit
+        :param max_limit: upper bound of the limit, more threads than that wait
+        :param decrease: factor applied to the limit on overload
+        :param latency_target: seconds, slower responses count as overload; None to compare
+                               against the average latency times latency_tolerance instead
+        :param latency_tolerance: factor over the average latency counted as overload
+        :param max_retries: retries of a request after throttling responses or connection errors
+        :param backoff: base of the exponential backoff in seconds
+        :param max_backoff: max. wait between retries in seconds, also caps Retry-After
+        :param timeout: request timeout in seconds used if the client has none
+        :param retry_statuses: status codes which are retried and count as overload
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError('limits must satisfy 1 <= min_limit <= max_limit')
+
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retry_statuses = frozenset(retry_statuses)
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        # limit at the last overload, growth above it is slowed down
+        self._ceiling = None
+
+        # moving average of the latency of successful requests
+        self._latency = None
+        self._samples = 0
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def call(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        sends a GET through the scheduler, retrying it if needed
+
+        :param send: function sending the request, called once per attempt
+        :return: the last response, also if it still is a throttling one after all retries
+        :raises requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError:
+                if the last attempt failed
+        """
+        attempt = 0
+        while True:
+            start = self._acquire()
+            try:
+                response = send()
+            except RETRY_ERRORS:
+                self._release(start, overload=True)
+                with self._condition:
+                    self.errors += 1
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+            except BaseException:
+                # any other error (redirects, decoding, interrupts) must free the slot too
+                self._release(start, overload=False)
+                raise
+            else:
+                latency = time.monotonic() - start
+                throttled = response.status_code in self.retry_statuses
+                self._release(start, overload=throttled or self._slow(latency),
+                              latency=None if throttled else latency)
+                if not throttled:
+                    return response
+
+                with self._condition:
+                    self.throttled += 1
+                if attempt >= self.max_retries:
+                    return response
+
+                delay = self._retry_after(response)
+                if delay is not None:
+                    self.pause(delay)
+                else:
+                    delay = self._backoff_delay(attempt)
+
+            attempt += 1
+            with self._condition:
+                self.retries += 1
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        holds back all requests for the given time
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _acquire(self) -> float:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._condition.wait(self._paused_until - now)
+                elif self._in_flight >= int(self.limit):
+                    self._condition.wait()
+                else:
+                    break
+
+            self._in_flight += 1
+            self.requests += 1
+            return now
+
+    def _release(self, start: float, overload: bool, latency: float = None):
+        with self._condition:
+            self._in_flight -= 1
+
+            if overload:
+                # one cut per round, requests sent before the last cut saw the old limit
+                if start >= self._last_decrease:
+                    self._ceiling = self.limit
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+            else:
+                step = 1 / self.limit
+                if self._ceiling is not None and self.limit + 1 >= self._ceiling:
+                    # probe the level which overloaded the server last time carefully
+                    step /= _PROBE_SLOWDOWN
+                self.limit = min(self.max_limit, self.limit + step)
+
+            if latency is not None:
+                self._samples += 1
+                if self._latency is None:
+                    self._latency = latency
+                else:
+                    self._latency += 0.1 * (latency - self._latency)
+
+            self._condition.notify_all()
+
+    def _slow(self, latency: float) -> bool:
+        if self.latency_target is not None:
+            return latency > self.latency_target
+
+        # the average needs a few samples before it means anything
+        return self._samples >= 10 and latency > self._latency * self.latency_tolerance
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            seconds = float(value)
+        except ValueError:
+            # http date
+            try:
+                seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+
+        return min(max(seconds, 0.0), self.max_backoff)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'requests': self.requests,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'latency': self._latency,
+            }
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable
+
+
+def request_key(credentials: str, endpoint: str, payload: dict = None) -> Hashable:
+    """
+    key of a GET request, equal for requests with the same url and parameters
+
+    the credentials are part of the key, so clients of different users never share results
+    """
+    return credentials, endpoint, tuple(sorted((k, str(v)) for k, v in (payload or {}).items() if v is not None))
+
+
+class _Call(object):
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    coalesces identical concurrent requests
+
+    the first caller of a key runs the request, callers arriving while it is in flight wait
+    for it and get the same decoded result (or exception). nothing is cached, a key is
+    requested again as soon as the running request is done. the shared results must not be
+    modified by the callers.
+
+    usage: ApiClient(base_url, apikey, singleflight=SingleFlight())
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        """
+        runs fn for the key unless a call for the key is already running, then waits for it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+            }
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio variant of SingleFlight, for AsyncApiClient
+
+    usage: AsyncApiClient(base_url, apikey, singleflight=AsyncSingleFlight())
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        """
+        awaits fn() for the key unless a call for the key is already running, then waits for it
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            try:
+                # a cancelled waiter must not cancel the call of the others
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the caller running the request was cancelled, not this one
+                return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        # mark the exception as retrieved if no one else is waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            'executed': self.executed,
+            'shared': self.shared,
+            'in_flight': len(self._calls),
+        }
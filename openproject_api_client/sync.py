@@ -0,0 +1,124 @@
+import datetime
+from typing import Dict, List
+
+# import types
+import openproject_api_client.resources as res
+from openproject_api_client.apiclient import ApiClient
+
+
+class WorkPackageSync(object):
+    """
+    keeps a local copy of workpackages up to date by fetching only what changed
+
+    every sync pages through the workpackages updated since the last run (server side
+    `updatedAt` filter) and merges them into `workpackages`, a dict keyed by id. watermarks
+    are kept per project id, None is used for a sync over all projects.
+
+    changes at the watermark itself are fetched again on the next run, `lockVersion` is used
+    to skip entries that are not newer than the local copy. deleted workpackages are not
+    reported by the api and therefore stay in the local copy.
+
+    pages are requested by offset, a workpackage updated during a run moves to the end and
+    shifts the following pages, so another one may be skipped. if the distinct workpackages
+    received do not match the total of the first page, the watermark is not advanced and the
+    next run fetches the same range again.
+
+    usage:
+        sync = WorkPackageSync(client)
+        sync.sync(project_id=46)     # first run fetches everything
+        ...
+        changed = sync.sync(project_id=46)     # later runs only fetch changes
+    """
+
+    def __init__(self, client: ApiClient, workpackages: Dict[int, res.WorkPackage] = None,
+                 watermarks: Dict[int, datetime.datetime] = None, page_size: int = 100):
+        """
+        :param client: client used to fetch workpackages
+        :param workpackages: existing local copy, keyed by id
+        :param watermarks: watermarks of a previous run as datetime or ISO 8601 string,
+                           keyed by project id (None for all projects)
+        :param page_size: page size used for fetching
+        """
+        self.client = client
+        self.workpackages = workpackages if workpackages is not None else {}
+        self.watermarks = {k: self._parse_timestamp(v) for k, v in (watermarks or {}).items()}
+        self.page_size = page_size
+
+    def sync(self, project_id: int = None, workers: int = None) -> List[res.WorkPackage]:
+        """
+        fetches workpackages changed since the last sync of the project and merges them
+
+        :param project_id: project to sync, None for all projects
+        :param workers: number of pages fetched concurrently, defaults to the client setting
+        :return: workpackages added or updated by this run
+        """
+        since = self.watermarks.get(project_id)
+        watermark = since
+        changed = []
+        total = None
+        received = set()
+
+        pages = self.client._iter_pages_updated_since(since, project_id, self.page_size, workers)
+        for page in pages:
+            if total is None:
+                total = page.total
+
+            for wp in self.client._iter_elements([page]):
+                received.add(wp.id)
+                if self.merge(wp):
+                    changed.append(wp)
+
+                if isinstance(wp.updatedat, datetime.datetime):
+                    if watermark is None or self._as_utc(wp.updatedat) > self._as_utc(watermark):
+                        watermark = wp.updatedat
+
+        # the result changed while paging, rows may have been skipped
+        complete = total is None or len(received) == total
+        if watermark is not None and complete:
+            self.watermarks[project_id] = watermark
+
+        return changed
+
+    def merge(self, wp: res.WorkPackage) -> bool:
+        """
+        merges a workpackage into the local copy
+
+        :return: True if it was added or replaced an older version
+        """
+        existing = self.workpackages.get(wp.id)
+        if existing is not None and existing.lockversion is not None and wp.lockversion is not None:
+            if wp.lockversion <= existing.lockversion:
+                # stale or unchanged
+                return False
+
+        self.workpackages[wp.id] = wp
+        return True
+
+    def state(self) -> dict:
+        """
+        watermarks as json serializable dict, restore with from_state()
+        """
+        return {
+            'watermarks': [[project_id, ApiClient._format_timestamp(watermark)]
+                           for project_id, watermark in self.watermarks.items()]
+        }
+
+    @classmethod
+    def from_state(cls, client: ApiClient, state: dict, workpackages: Dict[int, res.WorkPackage] = None,
+                   page_size: int = 100) -> 'WorkPackageSync':
+        watermarks = {project_id: watermark for project_id, watermark in state.get('watermarks', [])}
+        return cls(client, workpackages=workpackages, watermarks=watermarks, page_size=page_size)
+
+    @staticmethod
+    def _parse_timestamp(value) -> datetime.datetime:
+        if isinstance(value, str):
+            return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+        return value
+
+    @staticmethod
+    def _as_utc(value):
+        if isinstance(value, datetime.datetime) and value.tzinfo is None:
+            return value.replace(tzinfo=datetime.timezone.utc)
+
+        return value
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+# tracer receiving the spans of all clients, see set_tracer()
+_tracer = None
+
+
+class Span(object):
+    """
+    one timed operation, used as context manager. attributes can be added while it runs.
+    """
+    __slots__ = ('tracer', 'name', 'args', 'start', 'end', 'thread_id', 'thread_name')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+        self.end = None
+        self.thread_id = None
+        self.thread_name = None
+
+    def __enter__(self):
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start = time.perf_counter()
+        self.tracer.on_start(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.on_end(self)
+
+    def set(self, **args):
+        self.args.update(args)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    """
+    base class of tracers, override on_start() / on_end() to get a callback per span
+
+    spans are emitted around ApiClient.http_get (name 'http_get'), parsing of response bodies
+    ('json_loads'), ApiClient.decode ('decode', one per resource, also for collection
+    elements), every page of a paged collection ('page'), building the project tree
+    ('project_tree') and attaching relations ('update_relations', 'relation_index.attach').
+    """
+
+    def span(self, name: str, **args) -> Span:
+        return Span(self, name, args)
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """
+    installs a tracer for all clients, None disables tracing
+
+    :return: the previous tracer
+    """
+    global _tracer
+    previous = _tracer
+    _tracer = tracer
+    return previous
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **args):
+    """
+    span of the installed tracer, a no-op context manager if tracing is disabled
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+
+    return tracer.span(name, **args)
+
+
+class ChromeTraceRecorder(Tracer):
+    """
+    records spans as Chrome trace events, to be opened in chrome://tracing, Perfetto or
+    speedscope
+
+    usage:
+        recorder = ChromeTraceRecorder()
+        set_tracer(recorder)
+        sync.sync(project_id=46)
+        set_tracer(None)
+        recorder.save('sync.trace.json')
+    """
+
+    def __init__(self, max_events: int = 1000000):
+        """
+        :param max_events: events kept, later spans are counted in `dropped` only
+        """
+        self.max_events = max_events
+        self.events: List[dict] = []
+        self.dropped = 0
+
+        # (thread ident, thread name) -> tid, no thread objects to not keep finished threads
+        # alive. idents are reused after a thread ended, the name tells the threads apart
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+
+            key = (span.thread_id, span.thread_name)
+            tid = self._threads.get(key)
+            if tid is None:
+                tid = self._threads[key] = len(self._threads) + 1
+
+            self.events.append({
+                'name': span.name,
+                'cat': 'openproject',
+                'ph': 'X',
+                'ts': (span.start - self._origin) * 1e6,
+                'dur': (span.end - span.start) * 1e6,
+                'pid': self._pid,
+                'tid': tid,
+                'args': span.args,
+            })
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            threads = [{
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': self._pid,
+                'tid': tid,
+                'args': {'name': name},
+            } for (_, name), tid in self._threads.items()]
+
+            return {
+                'traceEvents': threads + list(self.events),
+                'displayTimeUnit': 'ms',
+                'otherData': {'dropped': self.dropped},
+            }
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, default=str)
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+            self.dropped = 0
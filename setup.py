@@ -21,7 +21,8 @@ setup(
     url="",
     keywords=["client api openproject"],
     install_requires=REQUIRES,
-    python_requires=">=3.6.0",
+    extras_require={"async": ["aiohttp>=3.7"], "fast": ["orjson>=3"]},
+    python_requires=">=3.7",
     entry_points={"console_scripts": ["openproject-cli = openproject_api_client.cli:main"]},
     packages=find_packages(),
     include_package_data=True,